@@ -2,6 +2,7 @@ import argparse
 import datetime
 from config.config import Config
 from src.data_fetchers.historical_data_fetcher import HistoricalDataFetcher
+from src.data_fetchers.bar_store import BarStore
 from alpaca.data.timeframe import TimeFrame
 
 def parse_args():
@@ -41,7 +42,8 @@ def main():
     timeframe = timeframe_map[args.timeframe]
 
     # Instantiate the data fetcher and retrieve historical bar data
-    d = HistoricalDataFetcher(Config.ALPACA_API_KEY, Config.ALPACA_SECRET_KEY, args.symbol)
+    d = HistoricalDataFetcher(Config.ALPACA_API_KEY, Config.ALPACA_SECRET_KEY, args.symbol,
+                              store=BarStore(Config.BAR_STORE_DIR))
     d.retrieve_historical_bar_data(timeframe, start_date, end_date)
 
 if __name__ == "__main__":
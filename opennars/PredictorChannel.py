@@ -1,12 +1,9 @@
 import random
-import socket
 
 from pynars.NARS import Reasoner
 from pynars.NARS.DataStructures.MC.SensorimotorChannel import SensorimotorChannel
-from pynars.Narsese import parser
-
-nars_address = ("127.0.0.1", 54321)
-predict_address = ("127.0.0.1", 12345)
+from pynars.Narsese import Task, TemplateCache
+from transport import Transport, UdpTransport
 
 
 class PredictorChannel(SensorimotorChannel):
@@ -21,6 +18,8 @@ class PredictorChannel(SensorimotorChannel):
         num_predictive_implications,
         num_reactions,
         N=1,
+        transport: Transport = None,
+        timeout: float = None,
     ):
         super().__init__(
             ID,
@@ -45,19 +44,23 @@ class PredictorChannel(SensorimotorChannel):
         self.num_babbling = 1000
         self.babbling_chance = 1
 
+        # where the status of the market comes from, and where the operations are sent to
+        self.transport = transport if transport is not None else UdpTransport()
+        # how long a cycle waits for the next bar; None waits forever, and a cycle without a bar senses nothing
+        self.timeout = timeout
+        # the status vocabulary is fixed, so each kind of sentence is parsed only once
+        self.templates = TemplateCache()
+
     def information_gathering(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.bind(nars_address)
-        data, _ = sock.recvfrom(1024)
-        status = data.decode()
-        if status != "CONNECTION FAILED":
-            try:
-                return [parser.parse(each) for each in status.split("|")]
-            except:
-                print(status)
-                exit()
-        else:
+        status = self.transport.receive_status(self.timeout)
+        if not status:
             return []
+        # sentences are parsed here, on the reasoner's thread, since the parser is not thread-safe
+        try:
+            return [each if isinstance(each, Task) else self.templates.parse(each) for each in status]
+        except:
+            print(status)
+            exit()
 
     def babbling(self):
         """
@@ -68,31 +71,36 @@ class PredictorChannel(SensorimotorChannel):
             return random.choice(list(self.operations.keys()))
 
 
-def execute_Mup():
+def execute_Mup(transport: Transport):
     """
     All channels need to register for its own operations. It is recommended to list them in the channel created.
     """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto("^up".encode(), predict_address)
+    transport.send_command("^up")
 
 
-def execute_Mdown():
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto("^down".encode(), predict_address)
+def execute_Mdown(transport: Transport):
+    transport.send_command("^down")
 
 
-def execute_Hold():
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.sendto("^hold".encode(), predict_address)
+def execute_Hold(transport: Transport):
+    transport.send_command("^hold")
 
 
-if __name__ == "__main__":
-    r = Reasoner(100, 100)
-    pc = PredictorChannel("Predictor", 2, 5, 20, 5, 50, 50, 1)
-    pc.register_operation("^up", execute_Mup, ["^up", "up"])
-    pc.register_operation("^down", execute_Mdown, ["^down", "down"])
-    pc.register_operation("^hold", execute_Hold, ["^hold", "hold"])
+def register_operations(pc: PredictorChannel):
+    pc.register_operation("^up", lambda: execute_Mup(pc.transport), ["^up", "up"])
+    pc.register_operation("^down", lambda: execute_Mdown(pc.transport), ["^down", "down"])
+    pc.register_operation("^hold", lambda: execute_Hold(pc.transport), ["^hold", "hold"])
+
 
+def run(pc: PredictorChannel, r: Reasoner, show=True):
     while True:
         pc.channel_cycle(r.memory)
-        pc.input_buffer.predictive_implications.show(lambda x: x.task.sentence)
+        if show:
+            pc.input_buffer.predictive_implications.show(lambda x: x.task.sentence)
+
+
+if __name__ == "__main__":
+    r = Reasoner(100, 100)
+    pc = PredictorChannel("Predictor", 2, 5, 20, 5, 50, 50, 1)
+    register_operations(pc)
+    run(pc, r)
@@ -0,0 +1,279 @@
+import os
+import io
+import sys
+import time
+import random
+import argparse
+import datetime
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from config.config import Config
+from alpaca.data.timeframe import TimeFrame
+from src.data_fetchers.bar_store import BarStore
+from src.data_fetchers.bar_series import BarSeries
+from src.data_fetchers.historical_data_fetcher import HistoricalDataFetcher
+from predict import percent_correct, status_messages, apply_command
+from transport import InProcessTransport
+
+# column order of `BacktestResult.operations`
+OPERATIONS = ("^up", "^down", "^hold")
+
+# the sizes `PredictorChannel` is built with unless told otherwise
+CHANNEL_SIZES = {
+    "num_slot": 2,
+    "num_events": 5,
+    "num_anticipations": 20,
+    "num_operations": 5,
+    "num_predictive_implications": 50,
+    "num_reactions": 50,
+}
+
+
+class BacktestResult:
+    """
+    The outcome of a backtest, one row per bar.
+
+    Attributes:
+        close (np.ndarray): The closing prices that were fed in.
+        predictions (np.ndarray): NARS' prediction at the end of each bar.
+        operations (np.ndarray): How often each of `OPERATIONS` was executed during each bar, shape (n_bars, 3).
+        scores (np.ndarray): `percent_correct` of each prediction against the close.
+    """
+
+    def __init__(self, close: np.ndarray) -> None:
+        n = len(close)
+        self.close = close
+        self.predictions = np.empty(n, dtype=np.float64)
+        self.operations = np.zeros((n, len(OPERATIONS)), dtype=np.int32)
+        self.scores = np.empty(n, dtype=np.float64)
+
+    @property
+    def mean_score(self) -> float:
+        return float(self.scores.mean()) if len(self.scores) else float("nan")
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            close=self.close,
+            predictions=self.predictions,
+            operations=self.operations,
+            scores=self.scores,
+        )
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{name}={n}" for name, n in zip(OPERATIONS, self.operations.sum(axis=0)))
+        return f"<BacktestResult: {len(self.scores)} bars, mean score {self.mean_score:.4f}, {counts}>"
+
+
+def make_predictor(seed: int = 0, reasoner=None, channel=None, config: str = "./config.json", channel_sizes: dict = None):
+    """
+    Builds a reasoner and a predictor channel connected through an in-process transport.
+
+    The random generators and the global clock of pynars are reset first, so that two predictors built
+    with the same seed behave identically.
+
+    Args:
+        seed (int): Seed of `random` and of `np.random`.
+        reasoner (Reasoner): Optional pre-built reasoner.
+        channel (PredictorChannel): Optional pre-built channel. It must use an `InProcessTransport`.
+        config (str): The pynars config file the reasoner and the parser are set up from.
+        channel_sizes (dict): Overrides of `CHANNEL_SIZES`.
+
+    Returns:
+        tuple: (reasoner, channel)
+    """
+    from pynars import Global
+    from pynars.NARS import Reasoner
+    from pynars.Narsese import parser
+    from PredictorChannel import PredictorChannel, register_operations
+
+    random.seed(seed)
+    np.random.seed(seed)
+    Global.time = 0
+    Global._input_id = 0
+
+    if reasoner is None:
+        reasoner = Reasoner(100, 100, config=config)
+        parser.config(config)
+    if channel is None:
+        sizes = dict(CHANNEL_SIZES, **(channel_sizes or {}))
+        # timeout=0: a cycle without a new bar does not wait for one
+        channel = PredictorChannel("Predictor", **sizes, N=1, transport=InProcessTransport(), timeout=0)
+        register_operations(channel)
+    return reasoner, channel
+
+
+def backtest(
+    close: np.ndarray,
+    cycles_per_bar: int = 1,
+    reasoner_cycles: int = 0,
+    augment: float = 100,
+    buffer: float = 1,
+    seed: int = 0,
+    reasoner=None,
+    channel=None,
+    config: str = "./config.json",
+    channel_sizes: dict = None,
+    quiet: bool = True,
+) -> BacktestResult:
+    """
+    Replays a series of closing prices through NARS, synchronously and in a single thread.
+
+    For each bar, the status messages are computed from the current prediction and handed to the channel,
+    then exactly `cycles_per_bar` channel cycles (each followed by `reasoner_cycles` reasoner cycles) are run,
+    and the operations they produce are applied to the prediction. Nothing depends on wall-clock timing, so
+    the same inputs and seed always give the same result.
+
+    Args:
+        close (np.ndarray): Closing prices, oldest first.
+        cycles_per_bar (int): Channel cycles per bar. Only the first one sees the new bar.
+        reasoner_cycles (int): Reasoner cycles after each channel cycle.
+        augment (float): How much an "^up" or "^down" moves the prediction.
+        buffer (float): How far the close may be from the prediction and still count as "good".
+        seed (int): Random seed, see `make_predictor`.
+        reasoner (Reasoner): Optional pre-built reasoner.
+        channel (PredictorChannel): Optional pre-built channel using an `InProcessTransport`.
+        config (str): The pynars config file, see `make_predictor`.
+        channel_sizes (dict): Overrides of `CHANNEL_SIZES`, see `make_predictor`.
+        quiet (bool): Whether to silence the per-cycle printing of pynars.
+
+    Returns:
+        BacktestResult: Predictions, operations and scores per bar.
+    """
+    if cycles_per_bar < 1:
+        raise ValueError("At least one cycle per bar is required.")
+
+    close = np.asarray(close, dtype=np.float64)
+    result = BacktestResult(close)
+    if len(close) == 0:
+        return result
+
+    reasoner, channel = make_predictor(seed, reasoner, channel, config, channel_sizes)
+    transport = channel.transport
+    operation_index = {name: i for i, name in enumerate(OPERATIONS)}
+
+    predicted = float(close[0])
+    predictions = result.predictions
+    operations = result.operations
+    sink = io.StringIO() if quiet else sys.stdout
+
+    for i, expected in enumerate(close.tolist()):
+        transport.send_status(status_messages(expected, predicted, buffer))
+        for _ in range(cycles_per_bar):
+            with redirect_stdout(sink):
+                channel.channel_cycle(reasoner.memory)
+                if reasoner_cycles:
+                    reasoner.run(reasoner_cycles)
+            while True:
+                command = transport.receive_command(0)
+                if command is None:
+                    break
+                predicted = apply_command(predicted, command, augment)
+                operations[i, operation_index[command]] += 1
+        predictions[i] = predicted
+        if quiet:
+            sink.seek(0)
+            sink.truncate()
+
+    result.scores[:] = percent_correct(close, predictions)
+    return result
+
+
+def load_series(symbol: str, timeframe, start: datetime.datetime, end: datetime.datetime) -> BarSeries:
+    """
+    Reads the bars from the local bar store, and only goes to Alpaca for ranges that are not stored yet.
+    """
+    store = BarStore(Config.BAR_STORE_DIR)
+    end = min(end, datetime.datetime.now())
+    if not store.missing_ranges(symbol, timeframe, start, end):
+        return BarSeries(symbol, store.read(symbol, timeframe, start, end))
+
+    fetcher = HistoricalDataFetcher(
+        api_key=Config.ALPACA_API_KEY,
+        secret_key=Config.ALPACA_SECRET_KEY,
+        symbol=symbol,
+        store=store,
+    )
+    return fetcher.retrieve_bar_series(timeframe=timeframe, start=start, end=end)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Deterministic offline backtest of the NARS predictor.")
+
+    parser.add_argument("--symbol", type=str, default="SPY", help="Ticker symbol (default: SPY)")
+    parser.add_argument("--start", type=str, default="2020-01-01", help="Start date in YYYY-MM-DD format")
+    parser.add_argument("--end", type=str, default="2025-01-01", help="End date in YYYY-MM-DD format")
+    parser.add_argument("--timeframe", type=str, default="day", choices=["minute", "hour", "day"],
+                        help="Timeframe for the data (default: day)")
+    parser.add_argument("--cycles-per-bar", type=int, default=1, help="Channel cycles per bar (default: 1)")
+    parser.add_argument("--reasoner-cycles", type=int, default=0,
+                        help="Reasoner cycles after each channel cycle (default: 0)")
+    parser.add_argument("--augment", type=float, default=100, help="Step of ^up / ^down (default: 100)")
+    parser.add_argument("--buffer", type=float, default=1, help="Tolerance of a good prediction (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N bars")
+    parser.add_argument("--output", type=str, default=None, help="Save the per-bar results to this .npz file")
+    parser.add_argument("--plot", action="store_true", help="Plot the close and the predictions")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of every cycle")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    timeframe_map = {
+        "minute": TimeFrame.Minute,
+        "hour": TimeFrame.Hour,
+        "day": TimeFrame.Day,
+    }
+    timeframe = timeframe_map[args.timeframe]
+    start = datetime.datetime.strptime(args.start, "%Y-%m-%d")
+    end = datetime.datetime.strptime(args.end, "%Y-%m-%d")
+
+    series = load_series(args.symbol, timeframe, start, end)
+    close = series.close[: args.limit]
+
+    t = time.perf_counter()
+    result = backtest(
+        close,
+        cycles_per_bar=args.cycles_per_bar,
+        reasoner_cycles=args.reasoner_cycles,
+        augment=args.augment,
+        buffer=args.buffer,
+        seed=args.seed,
+        quiet=not args.verbose,
+    )
+    elapsed = time.perf_counter() - t
+
+    print(result)
+    print(f"{len(close)} bars in {elapsed:.2f}s ({len(close) / max(elapsed, 1e-9):.0f} bars/s)")
+
+    if args.output:
+        result.save(args.output)
+
+    if args.plot:
+        import plotly.graph_objects as go
+
+        x = np.arange(len(close))
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=x, y=close, mode="lines+markers", name="Trade Close"))
+        fig.add_trace(go.Scatter(x=x, y=result.predictions, mode="lines+markers", name="Nars Prediction"))
+        fig.update_layout(
+            title=f"{args.symbol} Backtest (seed {args.seed})",
+            xaxis_title=f"Index({timeframe}'s)",
+            yaxis=dict(title="Trade Close / Nars Prediction"),
+            legend=dict(x=0.01, y=0.99),
+        )
+        fig.show()
+
+
+if __name__ == "__main__":
+    # terms are hashed by their strings, so iteration orders inside pynars change with Python's hash seed;
+    # pin it so that runs are comparable across processes
+    if os.environ.get("PYTHONHASHSEED") != "0":
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    main()
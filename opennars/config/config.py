@@ -14,4 +14,5 @@ else:
 class Config:
     """Application configuration settings."""
     ALPACA_API_KEY = os.getenv("ALPACA_API_KEY", "you-will-never-guess")
-    ALPACA_SECRET_KEY = os.getenv("ALPACA_SECRET_KEY", "")
\ No newline at end of file
+    ALPACA_SECRET_KEY = os.getenv("ALPACA_SECRET_KEY", "")
+    BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join(basedir, "..", "data", "bars"))
\ No newline at end of file
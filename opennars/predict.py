@@ -1,15 +1,16 @@
-import socket
+import argparse
 from threading import Thread, Lock
+import numpy as np
 import plotly.graph_objects as go
 from src.data_fetchers.historical_data_fetcher import HistoricalDataFetcher
+from src.data_fetchers.bar_store import BarStore
 from config.config import Config
 from alpaca.data.timeframe import TimeFrame
+from transport import Transport, make_transport
 
 import datetime
 
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-predict_address = ("localhost", 12345)
-nars_address = ("localhost", 54321)
+transport: Transport = None
 nars_predicted = 0
 augment = 0
 
@@ -18,65 +19,57 @@ datapoints = []
 
 
 def percent_correct(true, observed):
-    if true == 0:
-        return 1.0 if observed == 0 else 0.0
-    error = abs(observed - true) / abs(true)
-    return max(0.0, 1 - error)
+    """
+    1 - relative error, clamped to [0, 1]. Works element-wise on arrays; scalars give a float.
+    """
+    true = np.asarray(true, dtype=np.float64)
+    observed = np.asarray(observed, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.maximum(0.0, 1 - np.abs(observed - true) / np.abs(true))
+    score = np.where(true == 0, (observed == 0).astype(np.float64), score)
+    return score if score.ndim else float(score)
+
+
+def status_messages(expected, predicted, buffer=1):
+    """
+    The Narsese sentences describing one bar: which way the prediction should move, and how good it is.
+    """
+
+    # if nars is low go up
+    # elif nars is high go down
+    # else nars is within the buffer then good
+
+    if expected > predicted + buffer:
+        f = str(percent_correct(predicted, expected))
+        return ["<{up} --> [on]>. %1;0.9%", "<{SELF} --> [good]>. %" + f + ";0.9%"]
+
+    elif expected < predicted - buffer:
+        f = str(percent_correct(predicted, expected))
+        return ["<{down} --> [on]>. %1;0.9%", "<{SELF} --> [good]>. %" + f + ";0.9%"]
+
+    else:
+        return ["<{SELF} --> [good]>. %1;0.9%"]
+
+
+def apply_command(predicted, command, augment):
+    """
+    The prediction after an operation of NARS.
+    """
+    if command == "^up":
+        return predicted + augment
+    elif command == "^down":
+        return predicted - augment
+    # "^hold"
+    return predicted
 
 
 def send_status(trade_count, volume, expected, message=None):
 
     if message is None:
-
-        # if nars is low go up
-        # elif nars is high go down
-        # else nars is within 5 points then good
-
-        buffer = 1
         with nars_lock:
             cur_predicted = nars_predicted
 
-        f = None
-        if expected > cur_predicted + buffer:
-
-            msg_1 = "<{up} --> [on]>. %1;0.9%"
-
-            max_distance = 10
-            d = abs(expected - cur_predicted)
-            if max_distance <= 0:
-                # degenerate case: if no span, treat identical as 1, else 0
-                return 1.0 if d == 0 else 0.0
-
-            f = str(max(0.0, min(1, 1 - d / max_distance)))
-
-            f = str(percent_correct(cur_predicted, expected))
-
-            msg_2 = "<{SELF} --> [good]>. %" + f + ";0.9%"
-
-            sock.sendto((msg_1 + "|" + msg_2).encode(), nars_address)
-
-        elif expected < cur_predicted - buffer:
-            msg_1 = "<{down} --> [on]>. %1;0.9%"
-
-            max_distance = 10
-            d = abs(expected - cur_predicted)
-            if max_distance <= 0:
-                # degenerate case: if no span, treat identical as 1, else 0
-                return 1.0 if d == 0 else 0.0
-            # 1 - (d / D), clamped to [0,1]
-            f = str(max(0.0, min(1, 1 - d / max_distance)))
-
-            f = str(percent_correct(cur_predicted, expected))
-
-            msg_2 = "<{SELF} --> [good]>. %" + f + ";0.9%"
-
-            sock.sendto((msg_1 + "|" + msg_2).encode(), nars_address)
-
-        else:
-            msg_1 = None
-            msg_2 = None
-            msg = "<{SELF} --> [good]>. %1;0.9%"
-            sock.sendto(msg.encode(), nars_address)
+        transport.send_status(status_messages(expected, cur_predicted))
 
 
 def process_data():
@@ -97,36 +90,37 @@ def process_data():
         api_key=Config.ALPACA_API_KEY,
         secret_key=Config.ALPACA_SECRET_KEY,
         symbol=symbol,
+        store=BarStore(Config.BAR_STORE_DIR),
     )
-    data = fetcher.retrieve_historical_bar_data(
-        timeframe=timeframe, start=start, end=end
-    )
+    series = fetcher.retrieve_bar_series(timeframe=timeframe, start=start, end=end)
 
-    close = [p.close for p in data[symbol]]
+    close = series.close
 
     global nars_predicted
     global augment
     with nars_lock:
-        nars_predicted = close[0]
+        nars_predicted = float(close[0])
 
-    trade_count = [p.trade_count for p in data[symbol]]
-    volume = [p.volume for p in data[symbol]]
+    trade_count = series.trade_count
+    volume = series.volume
 
-    nars_predicted_array = []
+    nars_predicted_array = np.empty(len(series), dtype=np.float64)
 
     for i in range(1):
-        nars_predicted_array = []
-        for i, c in enumerate(close):
+        for i, c in enumerate(close.tolist()):
             # nars predict
 
             augment = 100
 
             send_status(trade_count[i], volume[i], expected=c)
-            nars_predicted_array.append(nars_predicted)
+            nars_predicted_array[i] = nars_predicted
+
+    score = percent_correct(close, nars_predicted_array)
+    print(f"mean accuracy: {score.mean():.4f}")
 
     fig = go.Figure()
 
-    x = list(range(len(close)))
+    x = np.arange(len(series))
     fig.add_trace(go.Scatter(x=x, y=close, mode="lines+markers", name="Trade Close"))
     fig.add_trace(
         go.Scatter(
@@ -147,25 +141,50 @@ def process_data():
 def receive_commands():
     global nars_predicted
     global augment
-    sock.bind(predict_address)
 
     while True:
-        data, _ = sock.recvfrom(1024)
-        command = data.decode()
+        command = transport.receive_command()
         print(f"command received: {command}")
 
         with nars_lock:
-            if command == "^up":
-                nars_predicted = nars_predicted + augment
+            nars_predicted = apply_command(nars_predicted, command, augment)
+
+
+def run_reasoner():
+    """
+    Runs the reasoner and the predictor channel in this process, fed through the in-process transport.
+    """
+    from pynars.NARS import Reasoner
+    from PredictorChannel import PredictorChannel, register_operations, run
+
+    r = Reasoner(100, 100)
+    pc = PredictorChannel("Predictor", 2, 5, 20, 5, 50, 50, 1, transport=transport)
+    register_operations(pc)
+    run(pc, r, show=False)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Feed historical bars to NARS and plot its predictions.")
+    parser.add_argument(
+        "--transport",
+        type=str,
+        default="udp",
+        choices=["udp", "inprocess"],
+        help="udp: talk to a separately started PredictorChannel.py; "
+        "inprocess: run the reasoner in this process (default: udp)",
+    )
+    return parser.parse_args()
 
-            elif command == "^down":
-                nars_predicted = nars_predicted - augment
 
-            elif command == "^hold":
-                pass
+if __name__ == "__main__":
+    args = parse_args()
+    transport = make_transport(args.transport)
 
+    if args.transport == "inprocess":
+        r = Thread(target=run_reasoner)
+        r.daemon = True
+        r.start()
 
-if __name__ == "__main__":
     t = Thread(target=receive_commands)
     t.daemon = True
     t.start()
@@ -89,6 +89,11 @@ class Config:
 
     maximum_evidental_base_length = 20000
 
+    # bounds of the caches of the inference engine
+    inference_cache_size: int = 10000
+    inference_cache_ttl: float = None # in seconds; if None, the entries do not expire
+    term_cache_size: int = 10000
+
     @classmethod
     def check(cls):
         '''Check if each parameter is valid'''
@@ -181,6 +186,12 @@ def load(file_path: str):
 
         Config.rate_discount_c = defaults.get('RATE_DISCOUNT_CONFIDENCE', Config.rate_discount_c)
 
+        inference_cache: dict = defaults.get('INFERENCE_CACHE', None)
+        if inference_cache is not None:
+            Config.inference_cache_size = inference_cache.get('SIZE', Config.inference_cache_size)
+            Config.inference_cache_ttl = inference_cache.get('TTL', Config.inference_cache_ttl)
+            Config.term_cache_size = inference_cache.get('TERM_SIZE', Config.term_cache_size)
+
         Config.rate_discount_p_internal_exp = defaults.get('RATE_DISCOUNT_PRIORITY_INTERNAL_EXPERIENCE', Config.rate_discount_p_internal_exp)
         Config.rate_discount_d_internal_exp = defaults.get('RATE_DISCOUNT_DURABILITY_INTERNAL_EXPERIENCE', Config.rate_discount_d_internal_exp)
         
@@ -1,47 +1,115 @@
-import inspect
+import sys
+from contextvars import ContextVar
+from types import ModuleType
 
-time = 0
-_input_id = 0
-def get_input_id():
-    global _input_id
-    input_id = _input_id
-    _input_id += 1
-    return input_id
 
 class States:
-    task = None
-    belief = None
-    concept = None
-    rules = None
+    '''What a reasoner is working on, recorded for debugging.'''
+    def __init__(self, context: 'ReasonerContext') -> None:
+        self.context = context
+        self.reset()
 
-    @classmethod
-    def reset(cls):
+    def reset(self):
         ''''''
-        for name in vars(cls):
-            attr = getattr(cls, name)
-            if inspect.ismethod(attr): continue
-            if name.startswith('_'): continue
-            if isinstance(attr, property): continue
-            # if isinstance(attr, classmethod): continue
-            setattr(cls, name, None)
-
-    @classmethod
-    def record_premises(cls, task=None, belief=None):
-        cls.task = task
-        cls.belief = belief
-    
-    @classmethod
-    def record_concept(cls, concept=None):
-        cls.concept = concept
-
-    @classmethod
-    def record_rules(cls, rules=None):
-        cls.rules = rules
-    
+        self.task = None
+        self.belief = None
+        self.concept = None
+        self.rules = None
+
+    def record_premises(self, task=None, belief=None):
+        self.task = task
+        self.belief = belief
+
+    def record_concept(self, concept=None):
+        self.concept = concept
+
+    def record_rules(self, rules=None):
+        self.rules = rules
+
+    @property
+    def time(self):
+        return self.context.time
+
+    def __repr__(self):
+        return f'<States: time={self.time}\n\tconcept: {self.concept}\n\ttask: {self.task}\n\tbelief: {self.belief}\n\trules: {self.rules}\n>.'
+
+
+class ReasonerContext:
+    '''
+    The state of a reasoner that used to be global: its clock, the counters of input ids and link ids, the debugging `States`, the registered operators and the bag of theorems (set up by the `Reasoner`), along with the path of the config it was loaded from.
+    `Global.time`, `Global.get_input_id()` etc. are those of the active context, i.e. the one entered last with `with context:` in the current thread or asyncio task, or else a default context shared by the process. A `Reasoner` enters its context in its cycles and inputs; code which builds tasks for it elsewhere, e.g. with the parser, should do so in `with reasoner.context:`.
+    A new context starts with the operators registered in the active one.
+    '''
+    def __init__(self, config: str=None) -> None:
+        self.time = 0
+        self.input_id = 0
+        self.link_id = 0
+        self.states = States(self)
+        active = context()
+        self.operators = dict(active.operators) if active is not None else {}
+        self.theorems = None
+        self.config = config
+
+    def get_input_id(self):
+        input_id = self.input_id
+        self.input_id += 1
+        return input_id
+
+    def get_link_id(self):
+        link_id = self.link_id
+        self.link_id += 1
+        return link_id
+
+    def __enter__(self) -> 'ReasonerContext':
+        # the tokens are kept per thread and asyncio task, since the same context may be entered from several at once
+        _tokens.set(_tokens.get(()) + (_context.set(self),))
+        return self
+
+    def __exit__(self, *exc_info):
+        tokens = _tokens.get()
+        _tokens.set(tokens[:-1])
+        _context.reset(tokens[-1])
+
+    def __repr__(self) -> str:
+        return f'<ReasonerContext: time={self.time}, input_id={self.input_id}>'
+
+
+def context() -> ReasonerContext:
+    '''The active context.'''
+    return _context.get(_default)
+
+_context: ContextVar = ContextVar('reasoner_context')
+_tokens: ContextVar = ContextVar('reasoner_context_tokens') # of the `with context:` blocks being run
+_default: ReasonerContext = None # the context of the process, created once `context` can be called
+_default = ReasonerContext()
+
+def get_input_id():
+    return context().get_input_id()
+
+def get_link_id():
+    return context().get_link_id()
+
+
+class _Global(ModuleType):
+    '''The state below is read from, and written to, the active context.'''
     @property
     def time(self):
-        return time
-    
-    @classmethod
-    def __repr__(cls):
-        return f'<States: time={time}\n\tconcept: {cls.concept}\n\ttask: {cls.task}\n\tbelief: {cls.belief}\n\trules: {cls.rules}\n>.'
\ No newline at end of file
+        return context().time
+
+    @time.setter
+    def time(self, value):
+        context().time = value
+
+    @property
+    def _input_id(self):
+        return context().input_id
+
+    @_input_id.setter
+    def _input_id(self, value):
+        context().input_id = value
+
+    @property
+    def States(self):
+        return context().states
+
+sys.modules[__name__].__class__ = _Global
@@ -23,6 +23,7 @@ from pynars.Config import Enable
 from typing import Callable, List, Tuple, Union
 import pynars.NARS.Operation as Operation
 from pynars import Global
+from pynars.Global import ReasonerContext
 from time import time
 from pynars.NAL.Functions.Tools import project_truth, project
 from ..GlobalEval import GlobalEval
@@ -33,9 +34,10 @@ class Reasoner:
     avg_inference = 0
     num_runs = 0
     
-    all_theorems = Bag(100, 100, take_in_order=False)
     theorems_per_cycle = 1
 
+    thresh_complexity = 20 # the derived tasks above this complexity are not output
+
     structural_enabled = True
     immediate_enabled = True
     compositional_enabled = True
@@ -46,12 +48,26 @@ class Reasoner:
             self._theorem = theorem
 
     def __init__(self, n_memory, capacity, config='./config.json', 
-                 nal_rules={1, 2, 3, 4, 5, 6, 7, 8, 9}, inference: str = 'kanren') -> None:
+                 nal_rules={1, 2, 3, 4, 5, 6, 7, 8, 9}, inference: str = 'kanren', context: ReasonerContext = None) -> None:
         # print('''Init...''')
+        # the clock, ids, theorems and operators of the reasoner; by default those of the active context, which reasoners built in it share
+        self.context = context if context is not None else Global.context()
+        with self.context:
+            self._init(n_memory, capacity, config, nal_rules, inference)
+
+    def _init(self, n_memory, capacity, config, nal_rules, inference):
         Config.load(config)
+        self.context.config = config
+        if self.context.theorems is None:
+            self.context.theorems = Bag(100, 100, take_in_order=False)
 
         self.global_eval = GlobalEval()
 
+        # built on first use, since they are only needed with some of the `Enable` flags
+        self.nal_rules = nal_rules
+        self._variable_inference = None
+        self._temporal_inference = None
+
         if inference == 'kanren':
             self.inference = KanrenEngine()
 
@@ -62,10 +78,8 @@ class Reasoner:
                     self.all_theorems.put(item)
         else:
             self.inference = GeneralEngine(add_rules=nal_rules)
-        
-        self.variable_inference = VariableEngine(add_rules=nal_rules)
-        self.temporal_inference = TemporalEngine(
-            add_rules=nal_rules)  # for temporal causal reasoning
+            # `GeneralEngine.match_rules` looks the variable rules up as well
+            self._variable_inference = VariableEngine(add_rules=nal_rules)
 
         self.memory = Memory(n_memory, global_eval=self.global_eval)
         self.overall_experience = Buffer(capacity)
@@ -88,6 +102,23 @@ class Reasoner:
         self.last_cycle_duration = 0
         self.avg_cycle_duration = 0
 
+    @property
+    def all_theorems(self) -> Bag:
+        return self.context.theorems
+
+    @property
+    def variable_inference(self) -> VariableEngine:
+        if self._variable_inference is None:
+            self._variable_inference = VariableEngine(add_rules=self.nal_rules)
+        return self._variable_inference
+
+    @property
+    def temporal_inference(self) -> TemporalEngine:
+        '''for temporal causal reasoning'''
+        if self._temporal_inference is None:
+            self._temporal_inference = TemporalEngine(add_rules=self.nal_rules)
+        return self._temporal_inference
+
     def reset(self):
         self.memory.reset()
         self.overall_experience.reset()
@@ -119,8 +150,27 @@ class Reasoner:
             tasks_all_cycles.append(self.cycle())
         return tasks_all_cycles
 
+    def run(self, n_cycles: int, sink: Callable[[Task], None] = None):
+        '''
+        Run `n_cycles` cycles, without collecting what each of them returns, for callers who only need the side effects, e.g. operations.
+        The derived tasks which `cycle` would output are passed one by one to `sink`, if given; the metrics are measured once for the whole run.
+        '''
+        start_time_in_seconds = time()
+        thresh_complexity = self.thresh_complexity
+        with self.context:
+            for _ in range(n_cycles):
+                tasks_derived: List[Task] = []
+                self._cycle(tasks_derived)
+                if sink is not None:
+                    for task in tasks_derived:
+                        if task.term.complexity <= thresh_complexity:
+                            sink(task)
+        if n_cycles > 0:
+            self.do_cycle_metrics(start_time_in_seconds, n_cycles)
+
     def input_narsese(self, text, go_cycle: bool = False) -> Tuple[bool, Union[Task, None], Union[Task, None]]:
-        success, task, task_overflow = self.narsese_channel.put(text)
+        with self.context:
+            success, task, task_overflow = self.narsese_channel.put(text)
         if go_cycle:
             tasks = self.cycle()
             return success, task, task_overflow, tasks
@@ -129,11 +179,27 @@ class Reasoner:
     def cycle(self):
         start_cycle_time_in_seconds = time()
         """Everything to do by NARS in a single working cycle"""
-        Global.States.reset()
         tasks_derived: List[Task] = []
+        task_operation_return, task_executed = None, None
+
+        with self.context:
+            judgement_revised, goal_revised, answers_question, answers_quest = self._cycle(tasks_derived)
+
+        thresh_complexity = self.thresh_complexity
+        tasks_derived = [
+            task for task in tasks_derived if task.term.complexity <= thresh_complexity]
+
+        """done with cycle"""
+        self.do_cycle_metrics(start_cycle_time_in_seconds)
+
+        return tasks_derived, judgement_revised, goal_revised, answers_question, answers_quest, (
+            task_operation_return, task_executed)
+
+    def _cycle(self, tasks_derived: List[Task]):
+        '''The work of a cycle, shared by `cycle` and `run`; the derived tasks are added to `tasks_derived`.'''
+        Global.States.reset()
 
         judgement_revised, goal_revised, answers_question, answers_quest = None, None, None, None
-        task_operation_return, task_executed = None, None
 
         random_number: float = random.random()
 
@@ -162,15 +228,8 @@ class Reasoner:
 
         # handle the sense of time
         Global.time += 1
-        thresh_complexity = 20
-        tasks_derived = [
-            task for task in tasks_derived if task.term.complexity <= thresh_complexity]
 
-        """done with cycle"""
-        self.do_cycle_metrics(start_cycle_time_in_seconds)
-
-        return tasks_derived, judgement_revised, goal_revised, answers_question, answers_quest, (
-            task_operation_return, task_executed)
+        return judgement_revised, goal_revised, answers_question, answers_quest
 
 
     def consider(self, tasks_derived: List[Task]):
@@ -340,11 +399,12 @@ class Reasoner:
 
     def register_operator(self, name_operator: str, callback: Callable):
         '''register an operator and return the operator if successful (otherwise, return None)'''
-        if not Operation.is_registered_by_name(name_operator):
-            from pynars.Narsese import Operator as Op
-            op = Op(name_operator)
-            Operation.register(op, callback)
-            return op
+        with self.context:
+            if not Operation.is_registered_by_name(name_operator):
+                from pynars.Narsese import Operator as Op
+                op = Op(name_operator)
+                Operation.register(op, callback)
+                return op
         return None
 
 #################################################
@@ -634,11 +694,15 @@ class Reasoner:
         return list(filter(lambda t: t.is_question or t.truth.c > 0, tasks_derived))
     
     # METRICS
+
+    def cache_info(self) -> dict:
+        '''The hits, misses, evictions and sizes of the caches of the inference engine, if it has any.'''
+        return self.inference.cache_info() if hasattr(self.inference, 'cache_info') else {}
     
-    def do_cycle_metrics(self, start_cycle_time_in_seconds: float):
+    def do_cycle_metrics(self, start_cycle_time_in_seconds: float, n_cycles: int = 1):
         #  record some metrics
         total_cycle_duration_in_seconds = time() - start_cycle_time_in_seconds
-        self.last_cycle_duration = total_cycle_duration_in_seconds # store the cycle duration
-        # calculate average
-        self.cycles_count += 1
-        self.avg_cycle_duration += (self.last_cycle_duration - self.avg_cycle_duration) / self.cycles_count
+        self.last_cycle_duration = total_cycle_duration_in_seconds / n_cycles # store the (mean) cycle duration
+        # calculate average, as if each of the `n_cycles` cycles took `last_cycle_duration`
+        self.cycles_count += n_cycles
+        self.avg_cycle_duration += (self.last_cycle_duration - self.avg_cycle_duration) * n_cycles / self.cycles_count
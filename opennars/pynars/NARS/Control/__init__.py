@@ -1 +1 @@
-from .Reasoner import Reasoner
\ No newline at end of file
+from .Reasoner import Reasoner, ReasonerContext
\ No newline at end of file
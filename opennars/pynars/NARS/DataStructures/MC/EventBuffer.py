@@ -45,6 +45,52 @@ class PredictiveImplication:
         return self.interval, task
 
 
+class PredictiveImplicationQueue(PriorityQueue):
+    """
+    A priority queue of predictive implications, which also indexes them by their terms,
+    so that an existing implication can be found without scanning the queue.
+    """
+
+    def __init__(self, size):
+        super().__init__(size)
+        self.index = {}
+
+    def push(self, item, value):
+        self.index[item.task.term] = item
+        super().push(item, value)
+
+    def pop(self):
+        item, value = super().pop()
+        self._unindex(item)
+        return item, value
+
+    def _remove(self, i):
+        value, item = super()._remove(i)
+        self._unindex(item)
+        return value, item
+
+    def _unindex(self, item):
+        if self.index.get(item.task.term, None) is item:
+            del self.index[item.task.term]
+
+    def __contains__(self, term):
+        return term in self.index
+
+    def take(self, term):
+        """
+        Remove and return the implication with the given term, or None.
+        """
+        item = self.index.get(term, None)
+        if item is None:
+            return None
+        i = self._find(item)
+        if i is None:
+            del self.index[term]
+            return None
+        self._remove(i)
+        return item
+
+
 class Slot:
     """
     It contains 3 parts: 1) events observed, 2) anticipations made, 3) operations to do.
@@ -66,6 +112,42 @@ class Slot:
     def random_pop(self):
         return self.events.random_pop()
 
+    def reset(self):
+        """
+        Empty the slot, so it can be reused as a new one.
+        """
+        self.events.clear()
+        self.anticipations.clear()
+        self.operations.clear()
+
+
+class SlotWindow:
+    """
+    A fixed number of slots used as a circular buffer: index 0 is the oldest slot, and the last index is the newest.
+    Moving the window on empties the oldest slot and reuses it as the newest, so no slot is created after the start.
+    """
+
+    def __init__(self, num_slots, num_events, num_anticipations, num_operations):
+        self._slots = [Slot(num_events, num_anticipations, num_operations) for _ in range(num_slots)]
+        self._start = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __getitem__(self, i):
+        n = len(self._slots)
+        if not -n <= i < n:
+            raise IndexError("slot index out of range")
+        return self._slots[(self._start + i) % n]
+
+    def __iter__(self):
+        for i in range(len(self._slots)):
+            yield self[i]
+
+    def rotate(self):
+        self._slots[self._start].reset()
+        self._start = (self._start + 1) % len(self._slots)
+
 
 class EventBuffer:
 
@@ -74,9 +156,9 @@ class EventBuffer:
         self.num_events = num_events
         self.num_anticipations = num_anticipations
         self.num_operations = num_operations
-        self.slots = [Slot(num_events, num_anticipations, num_operations) for _ in range(1 + 2 * num_slot)]
+        self.slots = SlotWindow(1 + 2 * num_slot, num_events, num_anticipations, num_operations)
         self.curr = num_slot
-        self.predictive_implications = PriorityQueue(num_predictive_implications)
+        self.predictive_implications = PredictiveImplicationQueue(num_predictive_implications)
         self.reactions = PriorityQueue(num_predictive_implications * 5)
         self.N = N
 
@@ -174,36 +256,28 @@ class EventBuffer:
         After the initial composition, pick the one with the highest priority in the current slot.
         Compose it with all other events in the current slot and the previous max events.
         """
-        if len(self.slots[self.curr].events) != 0:
-            curr_max, _ = self.slots[self.curr].pop()
-            curr_remaining = []
+        slot = self.slots[self.curr]
+        if len(slot.events) != 0:
+            # from the highest to the lowest, the first one is the max
+            curr_max, *curr_remaining = [each for _, each in reversed(slot.events)]
             curr_composition = []
-            while len(self.slots[self.curr].events) != 0:
-                curr_remaining.append(self.slots[self.curr].pop()[0])
-                curr_remaining[-1].is_component = 1
+            for each in curr_remaining:
+                each.is_component = 1
                 curr_max.is_component = 1
-                curr_composition.append(self.contemporary_composition([curr_max.task, curr_remaining[-1].task]))
+                curr_composition.append(self.contemporary_composition([curr_max.task, each.task]))
 
-            previous_max = []
             previous_composition = []
             for i in range(self.curr):
                 if len(self.slots[i].events) != 0:
-                    tmp, _ = self.slots[i].pop()
-                    previous_max.append(tmp)
+                    _, previous_max = self.slots[i].events.max
+                    self.slots[i].events.rotate_max()
                     # don't change previous max's "is_component"
                     curr_max.is_component = 1
-                    previous_composition.append(self.sequential_composition(previous_max[-1].task,
+                    previous_composition.append(self.sequential_composition(previous_max.task,
                                                                             Interval(self.curr - i), curr_max.task))
-                else:
-                    previous_max.append(None)
 
-            # after get all compositions, put everything back
-            for i in range(self.curr):
-                if previous_max[i] is not None:
-                    self.slots[i].push(previous_max[i], previous_max[i].priority)
-            self.slots[self.curr].push(curr_max, curr_max.priority)
-            for each in curr_remaining:
-                self.slots[self.curr].push(each, each.priority)
+            # being components changes the priorities in the current slot
+            slot.events.reevaluate(lambda x: x.priority)
 
             # add all compositions to the current slot
             self.push(curr_composition + previous_composition, memory)
@@ -214,9 +288,7 @@ class EventBuffer:
         If an anticipation does not even exist, apply the lowest satisfaction.
         """
         prediction_award_penalty = []
-        checked_buffer_tasks = []
-        while len(self.slots[self.curr].events) != 0:
-            buffer_task, _ = self.slots[self.curr].pop()
+        for _, buffer_task in reversed(self.slots[self.curr].events):
             for each_anticipation in self.slots[self.curr].anticipations:
                 # it is possible for an event satisfying multiple anticipations,
                 # e.g., A, +1 =/> B, A =/> B
@@ -225,7 +297,6 @@ class EventBuffer:
                     buffer_task.task = revision(each_anticipation.task, buffer_task.task)
                     satisfaction = 1 - satisfaction_level(each_anticipation.task.truth, buffer_task.task.truth)
                     prediction_award_penalty.append([each_anticipation.prediction, satisfaction])
-            checked_buffer_tasks.append(buffer_task)
 
         # if there are some unmatched anticipations, apply the lowest satisfaction
         for each_anticipation in self.slots[self.curr].anticipations:
@@ -234,9 +305,8 @@ class EventBuffer:
 
         print("prediction_award_penalty", prediction_award_penalty)
 
-        # put all buffer tasks back, some evaluations may change
-        for each in checked_buffer_tasks:
-            self.slots[self.curr].push(each, each.priority)
+        # some evaluations may change
+        self.slots[self.curr].events.reevaluate(lambda x: x.priority)
 
         # update the predictive implications
         for each in prediction_award_penalty:
@@ -251,23 +321,26 @@ class EventBuffer:
         slot in the future.
         If some implications cannot fire, increase the expiration of them.
         """
+        # index the events in the current slot by their terms, so each implication only looks at its own condition
+        events = {}
+        for _, each_event in self.slots[self.curr].events.pq:
+            events.setdefault(each_event.task.term, []).append(each_event)
+
         implications = []
         while len(self.predictive_implications) != 0:
             implication, _ = self.predictive_implications.pop()
             applied = False
-            for each_event in self.slots[self.curr].events.pq:
-                if implication.condition == each_event[1].task.term:
-                    interval, conclusion = implication.get_conclusion(each_event[1])
-                    if interval is None:
-                        break
-                    applied = True
-                    implication.expiration = max(0, implication.expiration - 1)
-                    anticipation = Anticipation(conclusion, implication)
-                    self.slots[self.curr + int(interval)].anticipations.append(anticipation)
-                    implications.append(implication)
+            for each_event in events.get(implication.condition, ()):
+                interval, conclusion = implication.get_conclusion(each_event)
+                if interval is None:
+                    break
+                applied = True
+                implication.expiration = max(0, implication.expiration - 1)
+                anticipation = Anticipation(conclusion, implication)
+                self.slots[self.curr + int(interval)].anticipations.append(anticipation)
             if not applied:
                 implication.expiration += 1
-                implications.append(implication)
+            implications.append(implication)
 
         for each in implications:
             self.predictive_implications.push(each, each.task.truth.e * preprocessing(each.task, memory) *
@@ -338,14 +411,10 @@ class EventBuffer:
         # self.to_memory_predictive_implication(memory, threshold_f, threshold_c, default_cooldown)
 
     def memory_based_evaluation(self, memory):
-        evaluated_buffer_tasks = []
-        while len(self.slots[self.curr].events) != 0:
-            buffer_task, _ = self.slots[self.curr].pop()
+        events = self.slots[self.curr].events
+        for _, buffer_task in events:
             buffer_task.preprocess_effect = preprocessing(buffer_task.task, memory)
-            evaluated_buffer_tasks.append(buffer_task)
-        # put all buffer tasks back
-        for each in evaluated_buffer_tasks:
-            self.slots[self.curr].push(each, each.priority)
+        events.reevaluate(lambda x: x.priority)
 
     @staticmethod
     def prediction_revision(existed_prediction, new_prediction):
@@ -380,13 +449,9 @@ class EventBuffer:
                                                             each_curr_event.task)
                         # if tmp.task.truth.e * preprocessing(tmp.task, memory) <= 0.05:
                         #     continue
-                        existed = None
-                        for j in range(len(self.predictive_implications)):
-                            if self.predictive_implications.pq[j][1].task.term == tmp.task.term:
-                                existed = self.predictive_implications.pq.pop(j)
-                                break
+                        existed = self.predictive_implications.take(tmp.task.term)
                         if existed is not None:
-                            tmp = self.prediction_revision(existed[1], tmp)
+                            tmp = self.prediction_revision(existed, tmp)
 
                         self.predictive_implications.push(tmp, tmp.task.truth.e * preprocessing(tmp.task, memory))
 
@@ -397,7 +462,7 @@ class EventBuffer:
                     self.slots[i].push(each, each.priority)
 
     def slots_cycle(self):
-        self.slots = self.slots[1:] + [Slot(self.num_events, self.num_anticipations, self.num_operations)]
+        self.slots.rotate()
 
     def buffer_cycle(self, tasks, memory, max_events_per_slot=5, threshold_f=0.8, threshold_c=0.9,
                      default_cooldown=10):
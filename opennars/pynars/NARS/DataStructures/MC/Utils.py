@@ -5,55 +5,145 @@ from pynars.NAL.Functions import Or
 
 class PriorityQueue:
     """
-    It is not a heap, it is a sorted array by insertion sort. Since we need to 1) access the largest item, 2) access the
-    smallest item, 3) access an item in the middle.
+    It is not a heap, it is a sorted array, since we need to 1) access the largest item, 2) access the smallest item,
+    3) access an item in the middle.
+
+    `pq` is a list of (value, item), sorted by value in ascending order, and can be read (or popped from) directly.
+    Positions are found by binary search, and an item is inserted or removed in place instead of rebuilding the list.
+    The last known value of each item is kept, so that `edit` can find an item without scanning the whole queue.
     """
 
     def __init__(self, size):
         self.pq = []
         self.size = size
+        # id(item) -> value when pushed; entries of items popped from `pq` directly are dropped lazily
+        self._values = {}
 
     def __len__(self):
         return len(self.pq)
 
+    def __iter__(self):
+        """
+        (value, item) from the lowest to the highest, without popping anything.
+        """
+        return iter(self.pq)
+
+    def __reversed__(self):
+        """
+        (value, item) from the highest to the lowest, without popping anything.
+        """
+        return reversed(self.pq)
+
+    def _bisect(self, value):
+        """
+        The index of the first pair whose value is not lower than `value`.
+        """
+        pq = self.pq
+        lo, hi = 0, len(pq)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if pq[mid][0] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, item):
+        """
+        The index of `item` (the very object) in `pq`, or None.
+        """
+        value = self._values.get(id(item), None)
+        if value is None:
+            return None
+        pq = self.pq
+        i = self._bisect(value)
+        while i < len(pq) and pq[i][0] == value:
+            if pq[i][1] is item:
+                return i
+            i += 1
+        # it has been removed from `pq` directly
+        self._values.pop(id(item), None)
+        return None
+
+    def _remove(self, i):
+        value, item = self.pq.pop(i)
+        self._values.pop(id(item), None)
+        return value, item
+
     def push(self, item, value):
         """
         Add a new one, regardless whether there are duplicates.
         """
-        added = False
-        for i in range(len(self.pq)):
-            if value <= self.pq[i][0]:
-                self.pq = self.pq[:i] + [(value, item)] + self.pq[i:]
-                added = True
-                break
-        if not added:
-            self.pq = self.pq + [(value, item)]
+        self.pq.insert(self._bisect(value), (value, item))
+        self._values[id(item)] = value
         if len(self.pq) > self.size:
-            self.pq = self.pq[1:]
+            self._remove(0)
+        if len(self._values) > 2 * len(self.pq) + 16:
+            self._values = {id(each): v for v, each in self.pq}
 
     def edit(self, item, value, identifier):
         """
         Replacement.
         """
-        found = False
-        for i in range(len(self.pq)):
-            if identifier(self.pq[i][1]) == identifier(item):
-                self.pq.pop(i)
-                # self.pq = self.pq[:i - 1] + self.pq[i:]
-                found = True
-                break
-        if not found:
-            return
+        i = self._find(item)
+        if i is None:
+            key = identifier(item)
+            for j in range(len(self.pq)):
+                if identifier(self.pq[j][1]) == key:
+                    i = j
+                    break
+            else:
+                return
+        self._remove(i)
         self.push(item, value)
 
     def pop(self):
         """
         Pop the highest.
         """
-        value, item = self.pq[-1]
-        self.pq = self.pq[:-1]
+        value, item = self.pq.pop()
+        self._values.pop(id(item), None)
         return item, value
 
+    def clear(self):
+        self.pq.clear()
+        self._values.clear()
+
+    def reevaluate(self, evaluate):
+        """
+        Give every item the value `evaluate(item)` and restore the order in place.
+        It is the same as popping everything and pushing it back with the new values, but without the copying.
+        """
+        pq = self.pq
+        pq[:] = [(evaluate(item), item) for _, item in pq]
+        # stable, so equal values stay in the order a pop-all-then-push-back would leave them in
+        pq.sort(key=lambda x: x[0])
+        self._values = {id(item): value for value, item in pq}
+
+    @property
+    def max(self):
+        """
+        The (value, item) with the highest value, without popping it.
+        """
+        return self.pq[-1]
+
+    def rotate_max(self):
+        """
+        Move the highest behind the others with the same value, which is where popping and pushing it back would put it,
+        so that items with equal values take turns at being the highest.
+        """
+        value, _ = self.pq[-1]
+        i = self._bisect(value)
+        if i < len(self.pq) - 1:
+            self.pq.insert(i, self.pq.pop())
+
+    @property
+    def min(self):
+        """
+        The (value, item) with the lowest value, without popping it.
+        """
+        return self.pq[0]
+
     def random_pop(self):
         """
         Based on the priority (not budget.priority), randomly pop one buffer task.
@@ -63,11 +153,10 @@ class PriorityQueue:
 
         It only gives the item, not the value.
         """
-        for i in range(len(self.pq) - 1, -1, -1):
-            if random.random() < self.pq[i][0]:
-                ret = self.pq[i]
-                self.pq = self.pq[:i] + self.pq[i + 1:]
-                return ret[1]
+        pq = self.pq
+        for i in range(len(pq) - 1, -1, -1):
+            if random.random() < pq[i][0]:
+                return self._remove(i)[1]
         return None
 
     def show(self, identifier):
@@ -75,7 +164,7 @@ class PriorityQueue:
         Show each item in the priority queue. Since it may contain items other than BufferTasks, you can design you own
         identifier to show what you want to show.
         """
-        for each in sorted(self.pq, key=lambda x: x[0]):
+        for each in self.pq:
             print(round(each[0], 3), "|", each[1].interval, "|", identifier(each[1]))
         print("---")
 
@@ -1,7 +1,6 @@
 from collections import OrderedDict
 import random
 import math
-from depq import DEPQ
 from pynars.Config import Config
 from pynars.Narsese import Item, Task
 from pynars.NAL.Functions.BudgetFunctions import *
@@ -9,30 +8,112 @@ from typing import Union, Callable, Any
 from .Distributor import Distributor
 
 
+class Level:
+    '''
+    The items of one priority level of a bag, from the oldest to the newest.
+
+    Every item remembers its slot, so removing it from anywhere only leaves a hole (None) behind. The holes at both ends are skipped, and all the holes are compacted away once they outnumber the items, so each operation is O(1) amortized.
+    '''
+    __slots__ = ('slots', 'index', 'head')
+
+    def __init__(self) -> None:
+        self.slots: list = []
+        self.index = {} # id(item) -> position in `slots`
+        self.head = 0 # position of the oldest item
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return (item for item in self.slots[self.head:] if item is not None)
+
+    def __contains__(self, item):
+        return id(item) in self.index
+
+    def append(self, item):
+        self.index[id(item)] = len(self.slots)
+        self.slots.append(item)
+
+    def remove(self, item) -> bool:
+        i = self.index.pop(id(item), None)
+        if i is None: return False
+        self._vacate(i)
+        return True
+
+    def first(self):
+        return self.slots[self.head]
+
+    def last(self):
+        return self.slots[-1]
+
+    def random(self):
+        '''
+        An item chosen uniformly at random, and its offset from the oldest slot. There are at least as many items as holes, so a slot is drawn about twice at most on average.
+        '''
+        slots, head = self.slots, self.head
+        span = len(slots) - head
+        while True:
+            offset = int(random.random() * span)
+            item = slots[head + offset]
+            if item is not None:
+                return item, offset
+
+    def clear(self):
+        self.slots.clear()
+        self.index.clear()
+        self.head = 0
+
+    def _vacate(self, i):
+        slots = self.slots
+        slots[i] = None
+        if not self.index:
+            slots.clear()
+            self.head = 0
+            return
+        while slots[-1] is None: slots.pop()
+        while slots[self.head] is None: self.head += 1
+        if len(slots) > 2 * len(self.index) + 8: # the holes, also those before `head`, outnumber the items
+            self._compact()
+
+    def _compact(self):
+        self.slots = [item for item in self.slots[self.head:] if item is not None]
+        self.index = {id(item): i for i, item in enumerate(self.slots)}
+        self.head = 0
+
+
 class Bag:
-    # TODO: Re-implement this DataStructure, in order to optimize the complexity.
     class LUT:
-        def __init__(self, key=None, *args, **kwargs):
+        '''
+        Maps the items of a bag by their keys. A key is `hash(key(k))`, or `hash(k)` if there is no `key` function; if `keyed`, it is the precomputed `k.key` of the item instead (see `Item.key`), so that looking an item up neither calls a function nor hashes anything.
+        '''
+        def __init__(self, key=None, *args, keyed: bool=False, **kwargs):
             self.lut = OrderedDict(*args, **kwargs)
             self.key = key
+            self.keyed = keyed
 
         def get(self, key, default = None):
+            if self.keyed: return self.lut.get(key.key, default)
             if self.key is not None: key = self.key(key)
             return self.lut.get(hash(key), default)
 
         def pop(self, key, default = None):
+            if self.keyed: return self.lut.pop(key.key, default)
             if self.key is not None: key = self.key(key)
             return self.lut.pop(hash(key), default)
 
         def __getitem__(self, k):
+            if self.keyed: return self.lut.__getitem__(k.key)
             if self.key is not None: k = self.key(k)
             return self.lut.__getitem__(hash(k))
 
         def __setitem__(self, k, v):
+            if self.keyed: return self.lut.__setitem__(k.key, v)
             if self.key is not None: k = self.key(k)
             return self.lut.__setitem__(hash(k), v)
 
         def __contains__(self, o: object) -> bool:
+            if self.keyed: return self.lut.__contains__(o.key)
+            if self.key is not None: o = self.key(o)
             return self.lut.__contains__(hash(o))
 
         def __len__(self):
@@ -42,27 +123,30 @@ class Bag:
             self.lut.clear()
 
 
-    def __init__(self, capacity: int, n_buckets: int = None, take_in_order: bool = True, key: Callable[[Item], Any]=None) -> None:
+    def __init__(self, capacity: int, n_buckets: int = None, take_in_order: bool = True, key: Callable[[Item], Any]=None, keyed: bool = False) -> None:
         '''
         Args:
             capacity (int): the maximum number of items.
             n_buckets (int): the number of buckets.
             take_in_order (bool): if True, an item is taken out in order within a bucket, otherwise a random item is taken out.
+            key (Callable): maps an item, or a key passed to `take_by_key`, to what it is looked up by; by default, the item itself.
+            keyed (bool): if True, items are looked up by their precomputed `Item.key` instead, and `key` is ignored.
         '''
         self.capacity = capacity
         self.take_in_order = take_in_order
-        self.item_lut = self.LUT(key=key)  # look up table
+        self.item_lut = self.LUT(key=key, keyed=keyed)  # look up table
         self.n_levels = n_buckets if n_buckets is not None else Config.num_buckets
         self.pointer = self.n_levels - 1  # Pointing to the Bag's current bucket number
 
         self.distributor = Distributor.new(self.n_levels)
         
-        self.levels = tuple(list() for i in range(self.n_levels))  # initialize buckets between 0 and capacity
+        self.levels = tuple(Level() for i in range(self.n_levels))  # initialize buckets between 0 and capacity
+        self.item_levels = {} # id(item) -> the index of the level the item is in
+        self.occupied = 0 # bit i is set if and only if level i is not empty
 
         self.current_counter = 0
         self.level_index = capacity % self.n_levels
 
-        # self.buckets = self.Depq(maxlen=self.n_buckets)
         n_digits = int(math.log10(self.n_levels)) + 3
 
         def map_priority(priority: float):
@@ -75,27 +159,22 @@ class Bag:
     def take(self, remove = True) -> Item:
         if len(self) == 0: return None
         if self._is_current_level_empty() or self.current_counter == 0:
-            self.pointer = self.distributor.pick(self.level_index)
-            self.level_index = self.distributor.next(self.level_index)
-            while self._is_current_level_empty():
-                self.pointer = self.distributor.pick(self.level_index)
-                self.level_index = self.distributor.next(self.level_index)
+            # skip the empty levels at once, rather than one pick at a time
+            index = self.distributor.next_occupied(self.level_index, self.occupied)
+            self.pointer = self.distributor.pick(index)
+            self.level_index = self.distributor.next(index)
 
+        level: Level = self.levels[self.pointer]
         if self.take_in_order:
             # take the first item from the current bucket
-            idx = 0
+            item, idx = level.first(), 0
         else:
             # take an item randomly from the current bucket
-            rnd = random.random()
-            cnt = len(self.levels[self.pointer])
-            idx = int(rnd * cnt)
+            item, idx = level.random()
 
         if remove:
-            bucket: list = self.levels[self.pointer]
-            item = bucket.pop(idx)
+            self._remove_from_level(item)
             self.item_lut.pop(item)
-        else:
-            item = self.levels[self.pointer][idx]
 
         self.current_counter = idx
 
@@ -105,9 +184,7 @@ class Bag:
         if remove:
             item: Item = self.item_lut.pop(key)
             if item is not None:
-                bucket = self.levels[self.map_priority(item.budget.priority)]
-                if item in bucket:
-                    bucket.remove(item)
+                self._remove_from_level(item)
         else:
             item = self.item_lut.get(key, None)
         return item
@@ -116,11 +193,9 @@ class Bag:
         '''Take the item with lowest prioity'''
         if len(self) == 0:
             return None
-        pointer = self._get_min_nonempty_level()
-        if not remove:
-            item = self.levels[pointer][0]
-        else:
-            item = self.levels[pointer].pop(0)
+        item = self.levels[self._get_min_nonempty_level()].first()
+        if remove:
+            self._remove_from_level(item)
             self.item_lut.pop(item)
         return item
 
@@ -128,12 +203,9 @@ class Bag:
         '''Take the item with highest prioity'''
         if len(self) == 0:
             return None
-        pointer = self._get_max_nonempty_level()
-        item = self.levels[pointer][-1]
-        if not remove:
-            item = self.levels[pointer][-1]
-        else:
-            item = self.levels[pointer].pop()
+        item = self.levels[self._get_max_nonempty_level()].last()
+        if remove:
+            self._remove_from_level(item)
             self.item_lut.pop(item)
         return item
 
@@ -153,18 +225,16 @@ class Bag:
             # if the capacity is exceeded, remove the lowest-priority item
             pointer = self._get_min_nonempty_level()
             if pointer_new >= pointer:
-                bucket = self.levels[self.pointer]
-                if len(bucket) > 0:
-                    item_lowest = bucket.pop(0)
-                    self.item_lut.pop(item_lowest)
-                    item_popped = item_lowest
+                item_lowest = self.levels[pointer].first()
+                self._remove_from_level(item_lowest)
+                self.item_lut.pop(item_lowest)
+                item_popped = item_lowest
             else:
                 item_popped = item
                 return item_popped
 
         self.item_lut[key] = item
-        level: list = self.levels[pointer_new]
-        level.append(item)
+        self._add_to_level(item, pointer_new)
 
         return item_popped
 
@@ -185,7 +255,7 @@ class Bag:
         Budget_merge(item_base.budget, item_merged.budget)
 
     def count(self):
-        return sum((len(level) for level in self.levels))
+        return len(self.item_levels)
 
     def __contains__(self, item):
         return item in self.item_lut
@@ -196,49 +266,36 @@ class Bag:
     def __len__(self):
         return len(self.item_lut)
 
-    def _is_current_level_empty(self):
-        return len(self.levels[self.pointer]) == 0
+    def _add_to_level(self, item: Item, pointer: int):
+        self.levels[pointer].append(item)
+        self.item_levels[id(item)] = pointer
+        self.occupied |= 1 << pointer
 
-    def _move_to_next_nonempty_level(self):
-        if len(self) == 0: return
-        self._move_upward_to_next_level()
-        while len(self.levels[self.pointer]) == 0:
-            self._move_upward_to_next_level()
+    def _remove_from_level(self, item: Item):
+        '''Remove an item from the level it was put in, even if its priority has changed since.'''
+        pointer = self.item_levels.pop(id(item), None)
+        if pointer is None: return
+        level = self.levels[pointer]
+        level.remove(item)
+        if len(level) == 0:
+            self.occupied &= ~(1 << pointer)
 
-    def _move_to_max_nonempty_level(self):
-        if len(self) == 0: return
-        self.pointer = self.n_levels - 1
-        while len(self.levels[self.pointer]) == 0:
-            self._move_down_to_next_level()
+    def _is_current_level_empty(self):
+        return not (self.occupied >> self.pointer) & 1
 
     def _get_min_nonempty_level(self):
-        pointer_cache = self.pointer
-        self._move_to_min_nonempty_level()
-        pointer = self.pointer
-        self.pointer = pointer_cache
-        return pointer
+        occupied = self.occupied
+        return (occupied & -occupied).bit_length() - 1
 
     def _get_max_nonempty_level(self):
-        pointer_cache = self.pointer
-        self._move_to_max_nonempty_level()
-        pointer = self.pointer
-        self.pointer = pointer_cache
-        return pointer
-
-    def _move_to_min_nonempty_level(self):
-        self.pointer = 0
-        self._move_to_next_nonempty_level()
-
-    def _move_down_to_next_level(self):
-        self.pointer = (self.pointer - 1) % self.n_levels
-
-    def _move_upward_to_next_level(self):
-        self.pointer = (self.pointer + 1) % self.n_levels
+        return self.occupied.bit_length() - 1
 
     def reset(self):
         self.item_lut.clear()
         for level in self.levels:
             level.clear()
+        self.item_levels.clear()
+        self.occupied = 0
         self.pointer = 0
 
 
@@ -27,8 +27,8 @@ class Buffer(Bag):
 
 
     def __init__(self, capacity: int, n_buckets: int=None, take_in_order: bool=False, max_duration: int=None) -> None:
-        key: Callable[[Task], Any] = lambda task: (hash(task), hash(task.stamp.evidential_base))
-        Bag.__init__(self, capacity, n_buckets=n_buckets, take_in_order=take_in_order, key=key)
+        # a task is looked up by `Task.key`, i.e. by `(hash(task), hash(task.stamp.evidential_base))`, computed when the task was created
+        Bag.__init__(self, capacity, n_buckets=n_buckets, take_in_order=take_in_order, keyed=True)
         self.max_duration = max_duration if max_duration is not None else Config.max_duration
         self.busyness = 0.5
 
@@ -1,7 +1,7 @@
 from typing import Tuple, Type, List, Union
 
 from pynars.NAL.Functions import Or
-from pynars.NAL.Functions.Tools import calculate_solution_quality, distribute_budget_among_links
+from pynars.NAL.Functions.Tools import distribute_budget_among_links
 from pynars.NAL.Functions.BudgetFunctions import Budget_merge
 from pynars.Narsese import Belief, Task, Item, Budget, Sentence, Term, Task, Judgement, Goal
 from pynars.Narsese._py.Sentence import Quest, Question
@@ -96,11 +96,7 @@ class Concept(Item):
         '''
         Select a belief with highest quality, within the belief_table, according to the task
         '''
-        belief_table: List[Task] = self.belief_table
-        if len(belief_table) == 0: return None
-        qualities = [(calculate_solution_quality(sentence, task.sentence), task) for task in belief_table]
-        _, item_max = max(qualities, key=lambda quality: quality[0])
-        return item_max
+        return self.belief_table.match(sentence)
         
     def add_belief(self, task: Task) -> Union[Judgement, None]:
         ''''''
@@ -114,11 +110,7 @@ class Concept(Item):
         '''
         Select a desire with highest quality, within the desire_table, according to the task
         '''
-        desire_table: List[Task] = self.desire_table
-        if len(desire_table) == 0: return None
-        qualities = [(calculate_solution_quality(goal, task.sentence), task) for task in desire_table]
-        _, item_max = max(qualities, key=lambda quality: quality[0])
-        return item_max
+        return self.desire_table.match(goal)
 
     def add_desire(self, task: Task) -> Union[Task, None]:
         ''''''
@@ -145,22 +137,45 @@ class Concept(Item):
             self._build_term_links(concepts, task, budget)
 
     def update_priority(self, p, concepts: Bag):
-        concepts.take_by_key(key=self,remove=True)
-        self.budget.priority = Or(self.budget.priority, p)
-        concepts.put(item=self)
+        self.update_budget(concepts, p=p)
 
     def update_durability(self, d, concepts: Bag):
-        concepts.take_by_key(key=self, remove=True)
-        self.budget.durability = (Config.concept_update_durability_weight * d
-                                + (1-Config.concept_update_durability_weight)*self.budget.durability)
-        concepts.put(item=self)
+        self.update_budget(concepts, d=d)
 
     def update_quality(self, q, concepts: Bag):
+        self.update_budget(concepts, q=q)
+
+    def update_budget(self, concepts: Bag, p=None, d=None, q=None):
+        '''
+        Update the priority, durability and/or quality, as `update_priority`, `update_durability` and `update_quality` do, taking the concept out of `concepts` and putting it back only once.
+        '''
         concepts.take_by_key(key=self, remove=True)
-        self.budget.quality = (Config.concept_update_quality_weight * q
-                                + (1-Config.concept_update_quality_weight)*self.budget.quality)
+        if p is not None:
+            self.budget.priority = Or(self.budget.priority, p)
+        if d is not None:
+            self.budget.durability = (Config.concept_update_durability_weight * d
+                                    + (1-Config.concept_update_durability_weight)*self.budget.durability)
+        if q is not None:
+            self.budget.quality = (Config.concept_update_quality_weight * q
+                                    + (1-Config.concept_update_quality_weight)*self.budget.quality)
         concepts.put(item=self)
-    
+
+    @classmethod
+    def link_templates(cls, term: Term) -> Tuple[Tuple[Term, Tuple[Tuple[int]]]]:
+        '''
+        The components of `term` which links are built to, i.e. all but the place-holder, each with its indices in `term` (see `Link.get_index`).
+        They are only computed once for a term without variables, since such a term is shared and never changes (see `Term.__deepcopy__`), and kept on the term itself: terms which are equal may still differ in the order of their components, e.g. (&|, A, B) and (&|, B, A).
+        '''
+        templates = getattr(term, '_link_templates', None)
+        if templates is None:
+            templates = tuple(
+                (component, tuple(tuple(index) for index in Link.get_index(term, component)))
+                for component in term.components if component != place_holder # should it skip the `place_holder?`
+            )
+            if not term.has_var:
+                term._link_templates = templates
+        return templates
+
     def _build_task_links(self, concepts: Bag, task: Task):
         ''''''
         budget = task.budget
@@ -168,12 +183,10 @@ class Concept(Item):
         self._insert_task_link(task_link, concepts)
         if self.term.is_atom: return
         sub_budget = budget.distribute(self.term.count()-1) # TODO: It seems that the budget is not the same with that in OpenNARS 3.0.4/3.1.0. Check here.
-        for term in self.term.components:
-            if term == place_holder: continue # should it skip the `place_holder?`
+        for term, indices in Concept.link_templates(self.term):
             concept = Concept._conceptualize(concepts, term, sub_budget)
             if concept is None: continue
             
-            indices = Link.get_index(self.term, term)
             for index in indices:
                 task_link = TaskLink(concept, task, sub_budget, index=index)
                 concept._insert_task_link(task_link, concepts)
@@ -188,9 +201,7 @@ class Concept(Item):
         if sub_budget.is_above_thresh:
             if self.term.is_atom: return
             
-            for term in self.term.components:
-                if term == place_holder: continue # should it skip the `place_holder?`
-                
+            for term, indices in Concept.link_templates(self.term):
                 # Option 1
                 # # in _build_task_links(...), the terms all have been conceptualized.
                 # # therefore, here if a concept is not in memory, it should not be used for term-links construction.
@@ -201,7 +212,6 @@ class Concept(Item):
                 sub_concept: Concept = Concept._conceptualize(concepts, term, task.budget)
                 if sub_concept is None: continue
 
-                indices = Link.get_index(self.term, term)
                 for index in indices:
                     self._insert_term_link(TermLink(self, sub_concept, sub_budget, False, index=index), concepts)
                     sub_concept._insert_term_link(TermLink(sub_concept, self, sub_budget, True, index=index), concepts)
@@ -212,15 +222,13 @@ class Concept(Item):
     def _insert_task_link(self, task_link: TaskLink, concepts: Bag):
         self.task_links.put(task_link)
         # update the concept's budget using the link's budget
-        self.update_priority(task_link.budget.priority, concepts)
-        self.update_durability(task_link.budget.durability, concepts)
+        self.update_budget(concepts, p=task_link.budget.priority, d=task_link.budget.durability)
         # TODO: more handling. see OpenNARS 3.1.0 Concept.java line 318~366.
     
     def _insert_term_link(self, term_link: TermLink, concepts: Bag):
         self.term_links.put(term_link)
         # update the concept's budget using the link's budget
-        self.update_priority(term_link.budget.priority, concepts)
-        self.update_durability(term_link.budget.durability, concepts)
+        self.update_budget(concepts, p=term_link.budget.priority, d=term_link.budget.durability)
         # TODO: more handling. see OpenNARS 3.1.0 Concept.java line 318~366.
 
     @classmethod
@@ -1,9 +1,12 @@
+from bisect import bisect_left
 from functools import lru_cache
 
 """
 A pseudo-random number generator, used in Bag
 """
 class Distributor:
+    n_probes = 8 # the number of indices `next_occupied` tries one by one, before it looks the levels up
+
     @staticmethod
     @lru_cache(maxsize=None)
     def new(range_val):
@@ -12,21 +15,65 @@ class Distributor:
 
     """
     For any number N < range, there is N+1 copies of it in the array, distributed as evenly as possible
+    The array, and the positions of each number in it, are only built when first used.
     """
     def __init__(self, range_val):
+        self.range = range_val
         self.capacity = (range_val * (range_val + 1)) // 2
-        self.order = [-1] * self.capacity
+        self._order = None
+        self._positions = None
+
+    @property
+    def order(self):
+        if self._order is None:
+            order = [-1] * self.capacity
+            index = 0
+            for rank in range(self.range, 0, -1):
+                for time in range(rank):
+                    index = ((self.capacity // rank) + index) % self.capacity
+                    while order[index] >= 0:
+                        index = (index + 1) % self.capacity
+                    order[index] = rank - 1
+            self._order = order
+        return self._order
 
-        index = 0
-        for rank in range(range_val, 0, -1):
-            for time in range(rank):
-                index = ((self.capacity // rank) + index) % self.capacity
-                while self.order[index] >= 0:
-                    index = (index + 1) % self.capacity
-                self.order[index] = rank - 1
+    @property
+    def positions(self):
+        '''The indices at which each number is in `order`, in ascending order.'''
+        if self._positions is None:
+            positions = tuple([] for _ in range(self.range))
+            for index, rank in enumerate(self.order):
+                positions[rank].append(index)
+            self._positions = positions
+        return self._positions
 
     def pick(self, index):
         return self.order[index]
 
     def next(self, index):
-        return (index + 1) % self.capacity
\ No newline at end of file
+        return (index + 1) % self.capacity
+
+    def next_occupied(self, index, occupied: int):
+        '''
+        The first index, from `index` on and wrapping around, whose number is in the bitmap `occupied` (bit i is set for number i), which must not be 0.
+        It is what calling `pick` and `next` until an occupied number comes up would give, but when few numbers are occupied, it looks up their next positions instead of going through all the others.
+        '''
+        order = self.order
+        capacity = self.capacity
+        i = index
+        for _ in range(self.n_probes):
+            if (occupied >> order[i]) & 1:
+                return i
+            i = (i + 1) % capacity
+
+        positions = self.positions
+        best = None
+        while occupied:
+            lowest = occupied & -occupied
+            occupied ^= lowest
+            p = positions[lowest.bit_length() - 1]
+            k = bisect_left(p, index)
+            j = p[k] if k < len(p) else p[0] + capacity
+            if best is None or j < best:
+                best = j
+        return best % capacity
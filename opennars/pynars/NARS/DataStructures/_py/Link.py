@@ -1,5 +1,6 @@
 from enum import Enum
 import enum
+from pynars import Global
 from pynars.Narsese import Item, Budget, Task, Term
 from typing import List, Type, Union
 from pynars.Narsese._py.Compound import Compound
@@ -34,16 +35,14 @@ class LinkType(Enum):
 
 
 class Link(Item):
-    link_id = 0
     type: LinkType = None
     component_index: List[List[int]] # TODO: refer to OpenNARS 3.0.4, TermLink.java line 75 and TaskLink.java line 85. But why use it?
     def __init__(self, source: 'Concept', target: Task, budget: Budget, source_is_component: bool=None, copy_budget=True, index: list=None) -> None:
-        self.link_id = Link.link_id
+        self.link_id = Global.get_link_id()
         self.component_index = tuple(index)
 
         hash_value = hash((source, target, self.component_index))
         super().__init__(hash_value, budget=budget,copy_budget=copy_budget)
-        Link.link_id += 1
         
         self.source: 'Concept' = source
         self.target: Task = target
@@ -1,53 +1,133 @@
-from typing import Union
-from depq import DEPQ
-from pynars.Narsese import Task, Belief
+from bisect import bisect_left, bisect_right
+from math import nan
+from typing import Dict, List, Union
+import numpy as np
+from pynars import Global
+from pynars.Narsese import Task, Belief, Sentence
+from pynars.NAL.Functions.UncertaintyMappingFunctions import w_to_c
+from pynars.NAL.Functions.Tools import calculate_solution_quality
 
 class Table:
     '''
     Used for belief table, desire table, etc., in the `Concept`.
+
+    The tasks are kept in descending order of priority, with the negated priorities in the parallel list `_keys`, so that a task is inserted by bisection; when the capacity is exceeded, the task with the lowest priority is dropped. Among tasks of equal priority, the one added last comes last.
+    Tasks are indexed by `Task.key` (i.e. by their sentence and evidential base), so that adding a task that is already in the table replaces it without a scan.
     '''
+    n_vectorized = 16 # the number of tasks from which `match` is computed with numpy
+
     def __init__(self, capacity):
-        self._table = DEPQ(maxlen=capacity)
+        self.capacity = capacity
+        self._tasks: List[Task] = []
+        self._keys: List[float] = [] # -priority of each task, in ascending order
+        self._index: Dict[int, float] = {} # Task.key -> -priority
+        # what `match` needs of each task, besides its truth-value
+        self._t_occurrence: List[float] = [] # nan if eternal
+        self._qvar: List[bool] = [] # whether the term has a query variable
 
     def add(self, task: Task, p: float):
-        if task in self:
-            self._table.remove(task)
-        self._table.insert(task, p)
+        key = task.key
+        if key in self._index:
+            self._remove(key)
+
+        k = -p
+        i = bisect_right(self._keys, k)
+        t_occurrence = task.stamp.t_occurrence
+        self._tasks.insert(i, task)
+        self._keys.insert(i, k)
+        self._t_occurrence.insert(i, t_occurrence if t_occurrence is not None else nan)
+        self._qvar.insert(i, task.term.has_qvar)
+        self._index[key] = k
+
+        if len(self._tasks) > self.capacity:
+            self._pop(len(self._tasks) - 1)
+
+    def _remove(self, key: int):
+        k = self._index[key]
+        for i in range(bisect_left(self._keys, k), bisect_right(self._keys, k)):
+            if self._tasks[i].key == key:
+                self._pop(i)
+                return
+
+    def _pop(self, i: int) -> Task:
+        task = self._tasks.pop(i)
+        del self._keys[i]
+        del self._t_occurrence[i]
+        del self._qvar[i]
+        del self._index[task.key]
+        return task
+
+    def match(self, sentence: Sentence) -> Union[Task, None]:
+        '''
+        Select the task that is the best solution to `sentence`, i.e. the first one with the highest `calculate_solution_quality(sentence, task.sentence)`, computed for all the tasks at once.
+        '''
+        tasks = self._tasks
+        n = len(tasks)
+        if n == 0: return None
+        if n == 1: return tasks[0]
+        if n < self.n_vectorized:
+            # numpy does not pay off for a handful of tasks
+            return max(tasks, key=lambda task: calculate_solution_quality(sentence, task.sentence))
 
+        c = np.fromiter((task.truth.c for task in tasks), np.float64, n)
 
-    # def remove(self, task: Task):
-    #     self._table.elim(task)
+        t_source = np.array(self._t_occurrence)
+        t_target = sentence.stamp.t_occurrence
+        # only an event whose occurrence time differs from that of `sentence` is projected and eternalized
+        projected = ~np.isnan(t_source)
+        if t_target is not None:
+            projected &= (t_source != t_target)
+        if projected.any():
+            if t_target is not None:
+                t_current = Global.time
+                v = np.abs(t_source - t_target)
+                is_in_interval = (np.minimum(t_source, t_target) <= t_current) & (t_current <= np.maximum(t_source, t_target))
+                s = np.where(is_in_interval, 0.5, np.minimum(np.abs(t_source - t_current), abs(t_target - t_current)))
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    c = np.where(projected, c * (1 - v/(2*s + v)), c)
+            k = np.fromiter((task.truth.k for task in tasks), np.float64, n)
+            c = np.where(projected, w_to_c(c, k), c)
+
+        if any(self._qvar):
+            punct = sentence.punct
+            is_zero = np.fromiter((qvar and task.sentence.punct != punct for task, qvar in zip(tasks, self._qvar)), bool, n)
+            c[is_zero] = 0.0
+
+        return tasks[int(np.argmax(c))]
 
     @property
     def empty(self):
-        return self._table.is_empty()
-    
+        return len(self._tasks) == 0
+
     def first(self):
-        return self._table.first() if len(self._table) > 0 else None
-    
+        return self._tasks[0] if len(self._tasks) > 0 else None
+
     def last(self):
-        return self._table.last() if len(self._table) > 0 else None
+        return self._tasks[-1] if len(self._tasks) > 0 else None
 
     def __iter__(self):
-        return (value for value, _ in self._table)
-    
+        return iter(self._tasks)
+
+    def __contains__(self, task: Task):
+        return task.key in self._index
+
     def values(self):
-        return tuple(iter(self))
-    
+        return tuple(self._tasks)
+
     def items(self):
-        return tuple(iter(self._table))
+        return tuple(zip(self._tasks, self.keys()))
 
     def keys(self):
-        return tuple(key for _, key in self._table)
+        return tuple(-k for k in self._keys)
 
     def __getitem__(self, idx: int) -> Union[Task, Belief]:
-        return self._table[idx][0]
+        return self._tasks[idx]
 
     def __len__(self):
-        return len(self._table)
+        return len(self._tasks)
 
     def __str__(self):
-        return f'<Table: #items={len(self._table)}, capacity={self._table.maxlen}>'
+        return f'<Table: #items={len(self._tasks)}, capacity={self.capacity}>'
 
     def __repr__(self):
-        return str(self)
\ No newline at end of file
+        return str(self)
@@ -0,0 +1,19 @@
+import random
+
+from pynars.Narsese import Budget, Item
+from pynars.NARS.DataStructures._py.Bag import Bag
+
+
+def test_levels_stay_bounded_when_taking_oldest_and_putting_newest():
+    random.seed(0)
+    bag = Bag(100, 10, take_in_order=True)
+    for i in range(20):
+        bag.put(Item(i, Budget(0.5, 0.5, 0.5)))
+
+    for _ in range(20_000):
+        bag.put(bag.take())
+
+    assert len(bag) == 20
+    for level in bag.levels:
+        assert len(level.slots) <= 2 * len(level) + 8
+        assert level.head <= len(level.slots)
@@ -3,7 +3,7 @@ from pynars.NAL.Functions.Tools import project_truth, revisible
 from pynars.NARS.DataStructures._py.Link import LinkType
 from .Rules import *
 from ...RuleMap.add_rule import _compound_has_common, _compound_at, _at, _common
-from pynars.NARS.RuleMap.add_rule import CommonId
+from pynars.NARS.RuleMap.add_rule import CommonId, task_type_id
 from pynars.Narsese._py.Budget import Budget
 from pynars.Narsese._py.Connector import Connector
 from pynars.Narsese._py.Copula import Copula
@@ -13,6 +13,8 @@ from typing import Callable, List, Tuple
 from ...RuleMap import RuleCallable, RuleMap
 from pynars.NAL.Inference import local__revision
 from pynars import Global
+from pynars.Config import Config
+from pynars.utils.Cache import LRUCache
 from ..Engine import Engine
 from .extract_feature import extract_feature
 from pathlib import Path
@@ -30,6 +32,8 @@ class GeneralEngine(Engine):
     def __init__(self, build=True, add_rules={1,2,3,4,5,6,7,8,9}):
         ''''''
         super().__init__()
+        # (task term, belief term, ...) -> the rules of both engines, see `match_rules`; one per engine, so that each reasoner (and thread) has its own
+        self.dispatch_cache = LRUCache(Config.inference_cache_size, Config.inference_cache_ttl)
         
         n_link_types = max([t.value for t in LinkType.__members__.values()])
         n_copula = len(Copula)
@@ -102,8 +106,7 @@ class GeneralEngine(Engine):
         pass
 
 
-    @classmethod
-    def match(cls, task: Task, belief: Belief, term_belief: Term, task_link, term_link):
+    def match(self, task: Task, belief: Belief, term_belief: Term, task_link, term_link):
         '''To verify whether the task and the belief can interact with each other'''
         is_valid = False
         is_revision = False
@@ -118,11 +121,7 @@ class GeneralEngine(Engine):
                 pass
             elif not belief.evidential_base.is_overlaped(task.evidential_base):
                 # Engine.rule_map.verify(task_link, term_link)
-                rules = GeneralEngine.match_rule(task, belief, term_belief, task_link, term_link)
-
-                rules_var = VariableEngine.match_rule(task, belief, term_belief, task_link, term_link)
-                if rules_var is not None:
-                    rules = rules | rules_var if rules is not None else rules_var
+                rules = self.match_rules(task, belief, term_belief, task_link, term_link)
 
                 if rules is not None and len(rules) > 0:
                     is_valid = True
@@ -140,6 +139,38 @@ class GeneralEngine(Engine):
 
         return is_valid, is_revision, rules
 
+    def match_rules(self, task: Task, belief: Belief, term_belief: Term, task_link: TaskLink, term_link: TermLink) -> OrderedSet:
+        '''
+        The rules matched by both `GeneralEngine.match_rule` and `VariableEngine.match_rule`, for a task and a belief.
+        They are cached by the terms, the type of the task and the types of the links, if the terms have no variables. Since such terms are shared and never change, they are told apart by identity, which is also what the features depend on: equal terms may still differ in the order of their components.
+        '''
+        terms = (task.term, belief.term, term_belief)
+        cached = not any(term.has_var for term in terms if term is not None)
+        if cached:
+            key = (
+                *map(id, terms), task_type_id(task),
+                task_link.type, term_link.type if term_link is not None else None,
+                task_link.component_index if task_link.type is LinkType.TRANSFORM else None
+            )
+            entry = self.dispatch_cache.get(key, None)
+            if entry is not None:
+                return entry[0]
+
+        rules = GeneralEngine.match_rule(task, belief, term_belief, task_link, term_link)
+
+        rules_var = VariableEngine.match_rule(task, belief, term_belief, task_link, term_link)
+        if rules_var is not None:
+            rules = rules | rules_var if rules is not None else rules_var
+
+        if cached:
+            # the terms are kept alive along with the entry, so that their ids are not reused meanwhile
+            self.dispatch_cache.put(key, (rules, terms))
+        return rules
+
+    def cache_info(self) -> dict:
+        '''The hits, misses, evictions and size of the cache of `match_rules`.'''
+        return {'match_rules': self.dispatch_cache.info}
+
     @classmethod
     def match_rule(cls, task: Task, belief: Union[Belief, None], belief_term: Union[Term, Compound, Statement, None], task_link: TaskLink, term_link: TermLink) -> OrderedSet:
         '''
@@ -350,7 +381,7 @@ class GeneralEngine(Engine):
         task: Task = task_link_valid.target
 
         # inference for single-premise rules
-        is_valid, _, rules_immediate = GeneralEngine.match(task, None, None, task_link_valid, None)
+        is_valid, _, rules_immediate = self.match(task, None, None, task_link_valid, None)
         if is_valid:
             Global.States.record_premises(task)
             Global.States.record_rules(rules_immediate)
@@ -381,7 +412,7 @@ class GeneralEngine(Engine):
             task = task_subst or task_elimn or task_intro or task
 
             # Verify the interaction, and find a pair which is valid for inference.
-            is_valid, is_revision, rules = GeneralEngine.match(task, belief, term_belief, task_link_valid, term_link)
+            is_valid, is_revision, rules = self.match(task, belief, term_belief, task_link_valid, term_link)
             if is_revision: tasks_derived.append(local__revision(task, belief, task_link_valid.budget, term_link.budget))
             if is_valid: 
                 term_link_valid = term_link
@@ -1,11 +1,11 @@
 from collections import OrderedDict
 from pynars.NARS.DataStructures import LinkType, TaskLink, TermLink
-from sparse_lut import SparseLUT
+from pynars.utils.RuleTable import RuleTable
 from pynars import Global
 from ....RuleMap.add_rule import *
 
 
-def add_rules__NAL7(sparse_lut: SparseLUT, structure: OrderedDict):
+def add_rules__NAL7(sparse_lut: RuleTable, structure: OrderedDict):
     ''''''
     '''deduction'''
     add_rule(sparse_lut, structure,
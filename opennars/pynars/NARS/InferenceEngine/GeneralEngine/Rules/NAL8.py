@@ -1,12 +1,12 @@
 from collections import OrderedDict
 from pynars.NARS.DataStructures import LinkType, TaskLink, TermLink
 from pynars.Narsese._py import SELF
-from sparse_lut import SparseLUT
+from pynars.utils.RuleTable import RuleTable
 from pynars import Global
 from ....RuleMap.add_rule import *
 
 
-def add_rules__NAL8(sparse_lut: SparseLUT, structure: OrderedDict):
+def add_rules__NAL8(sparse_lut: RuleTable, structure: OrderedDict):
     ''''''
     '''
     (&/,A, B, C)!
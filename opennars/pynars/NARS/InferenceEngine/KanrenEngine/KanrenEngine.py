@@ -1,11 +1,38 @@
+import json
+import os
+import tempfile
+from hashlib import sha256
 from .util import *
 
 class KanrenEngine:
-    
+    cached_methods = ('backward', 'inference', 'inference_immediate', 'inference_structural', 'inference_compositional')
+
+    path_rules = Path(__file__).parent/'nal-rules.yml'
+    # the strong rules matched by each theorem, which take most of the conversion, saved along with the digest of the rules
+    path_theorems = Path(__file__).parent/'theorems.json'
+
+    # the attributes set by `convert_rules`, and, by digest of the rules, their values, which the engines of a process share
+    converted_names = ('rules_backward', 'rules_syllogistic', 'rules_first_order', 'rules_immediate', 'rules_conditional_compositional', 'theorems',
+                       'index_backward', 'index_syllogistic', 'index_conditional_compositional', 'index_strong')
+    converted = {}
+
     def __init__(self):
-        
-        with open(f'{Path(__file__).parent}/nal-rules.yml', 'r') as file:
-            config = yaml.safe_load(file)
+        self.caches = {name: LRUCache(Config.inference_cache_size, Config.inference_cache_ttl) for name in self.cached_methods}
+        if term_cache_info().maxsize != Config.term_cache_size:
+            set_term_cache_size(Config.term_cache_size)
+
+        with open(self.path_rules, 'rb') as file:
+            content = file.read()
+        digest = sha256(content).hexdigest()
+
+        if digest not in self.converted:
+            self.convert_rules(yaml.safe_load(content), digest)
+            self.converted[digest] = {name: getattr(self, name) for name in self.converted_names}
+        self.__dict__.update(self.converted[digest])
+
+    def convert_rules(self, config: dict, digest: str):
+        # `convert` fills it again, so that the indices of the theorems' matching rules are those of this conversion
+        rules_strong.clear()
 
         nal1_rules = split_rules(config['rules']['nal1'])
         nal2_rules = split_rules(config['rules']['nal2'])
@@ -53,24 +80,72 @@ class KanrenEngine:
         rules = nal1_rules + nal2_rules + nal3_rules + nal5_rules + higher_order + conditional_syllogistic
 
         self.rules_syllogistic = [convert(r) for r in rules]
+        # the rules between simple statements, e.g. NAL-1/2 and their higher order variants, are applied without miniKanren
+        self.rules_first_order = [first_order(r) for r in self.rules_syllogistic]
 
         self.rules_immediate = [convert_immediate(r) for r in split_rules(config['rules']['immediate'])]
 
         self.rules_conditional_compositional = [convert(r, True) for r in split_rules(config['rules']['conditional_compositional'])]
 
-        self.theorems = [convert_theorems(t) for t in split_rules(config['theorems'])]
-
+        # the matching rules are indices into `rules_strong`, so they are only valid for the same strong rules in the same order
+        key = sha256(digest.encode())
+        key.update(repr([(premises, r) for premises, (r, _) in rules_strong]).encode())
+        key = key.hexdigest()
+
+        theorems = split_rules(config['theorems'])
+        matching_rules = self.load_theorems(key, len(theorems))
+        self.theorems = [convert_theorems(t, m) for t, m in zip(theorems, matching_rules or [None]*len(theorems))]
+        if matching_rules is None:
+            self.dump_theorems(key)
+
+        # candidate rules by the shapes of the premises, so that most rules are never tried
+        self.index_backward = RuleIndex(self.rules_backward, (0, 2))
+        self.index_syllogistic = RuleIndex(self.rules_syllogistic)
+        self.index_conditional_compositional = RuleIndex(self.rules_conditional_compositional)
+        self.index_strong = RuleIndex(rules_strong, (1,))
+
+    def load_theorems(self, key: str, n_theorems: int):
+        '''The matching rules of the theorems saved for the same key, or None, also if the file cannot be read.'''
+        try:
+            with open(self.path_theorems, 'r') as file:
+                saved = json.load(file)
+            matching_rules = [tuple(m) for m in saved['matching_rules']]
+            if saved['digest'] != key or len(matching_rules) != n_theorems: return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if any(not isinstance(i, int) or not 0 <= i < len(rules_strong) for m in matching_rules for i in m): return None
+        return matching_rules
+
+    def dump_theorems(self, key: str):
+        '''Save the matching rules through a temporary file, so that no reader sees it half written; nothing is saved if it cannot be written, e.g. in a read-only install.'''
+        path = self.path_theorems
+        try:
+            fd, path_tmp = tempfile.mkstemp(dir=path.parent, prefix=f'{path.stem}.', suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump({'digest': key, 'matching_rules': [m for _, _, m in self.theorems]}, file)
+            os.replace(path_tmp, path)
+        except (OSError, ValueError):
+            if os.path.exists(path_tmp): os.remove(path_tmp)
+
+    def cache_info(self) -> dict:
+        '''The hits, misses, evictions and sizes of the caches, by method; the cache of `term` is under "term".'''
+        info = {name: cache.info for name, cache in self.caches.items()}
+        info['term'] = term_cache_info()
+        return info
 
     #################################################
 
-    @cache_notify
+    @cache_notify(premises_signature)
     def backward(self, q: Sentence, t: Sentence) -> list:
         results = []
 
         lq = logic(q.term)
         lt = logic(t.term)
 
-        for rule in self.rules_backward:
+        for rule in self.index_backward(lt, lq):
             res = self.apply(rule, lt, lq, backward=True)
             if res is not None:
                 # TODO: what is a better way of handling this?
@@ -93,7 +168,7 @@ class KanrenEngine:
         return results
 
     # INFERENCE (SYLLOGISTIC)
-    @cache_notify
+    @cache_notify(premises_signature)
     def inference(self, t1: Sentence, t2: Sentence) -> list:
         # print(f'Inference syllogistic\n{t1}\n{t2}')
         results = []
@@ -111,10 +186,13 @@ class KanrenEngine:
 
         l1 = logic(t1t)
         l2 = logic(t2t)
+        # unifying premises with variables may bind them, which is left to miniKanren
+        first_order = not (t1t.has_var or t2t.has_var)
 
         # temporal = t1.tense is not Tense.Eternal and t2.tense is not Tense.Eternal
 
-        for rule in self.rules_syllogistic:
+        for i in self.index_syllogistic.ids(l1, l2):
+            rule = self.rules_syllogistic[i]
         
             # if temporal:
             #     c = term(rule[0][2])
@@ -129,8 +207,12 @@ class KanrenEngine:
             #             c.copula = Copula.PredictiveImplication
                     
             #         rule = ((p1, p2, logic(c, True)), (r, constraints))
-                    
-            res = self.apply(rule, l1, l2)
+
+            rule_first_order = self.rules_first_order[i]
+            if first_order and rule_first_order is not None:
+                res = self.apply_first_order(rule, rule_first_order, l1, l2)
+            else:
+                res = self.apply(rule, l1, l2)
             if res is not None:
                 r, _ = rule[1]
                 inverse = True if r[-1] == "'" else False
@@ -171,36 +253,46 @@ class KanrenEngine:
             result = run(1, c, eq((p1, p2), (l1, l2)), *constraints)
 
         if result:
-            conclusion = term(result[0])
-            
-            # apply diff connector
-            difference = diff(conclusion)
-            # print(difference)
-
-            # sanity check - single variable is not a valid conclusion
-            if type(conclusion) is Variable or type(conclusion) is cons \
-                or type(difference) is Variable or type(difference) is cons:
-                return None
-            
-            if difference == None:
-                # print("Rule application failed.")
-                return None
-            elif difference == -1:
-                # print(conclusion) # no diff application
-                return (conclusion, r)
-            else:
-                # print(difference) # diff applied successfully
-                return (difference, r)
+            return self.conclude(term(result[0]), r)
         else:
             # print("Rule application failed.")
             return None
 
+    def apply_first_order(self, rule, rule_first_order, l1, l2):
+        '''The same as `apply(rule, l1, l2)`, for premises without variables and a rule given by `first_order`.'''
+        result = match_first_order(rule_first_order, l1, l2)
+        if result is None:
+            return None
+        r, _ = rule[1]
+        return self.conclude(term(result), r)
+
+    def conclude(self, conclusion, r):
+        '''The conclusion of a rule, with the diff connector applied, or None if it is not valid.'''
+        # apply diff connector
+        difference = diff(conclusion)
+        # print(difference)
+
+        # sanity check - single variable is not a valid conclusion
+        if type(conclusion) is Variable or type(conclusion) is cons \
+            or type(difference) is Variable or type(difference) is cons:
+            return None
+        
+        if difference == None:
+            # print("Rule application failed.")
+            return None
+        elif difference == -1:
+            # print(conclusion) # no diff application
+            return (conclusion, r)
+        else:
+            # print(difference) # diff applied successfully
+            return (difference, r)
+
 
     #############
     # IMMEDIATE #
     #############
     
-    @cache_notify
+    @cache_notify(lambda t, backward=False: (sentence_signature(t), backward))
     def inference_immediate(self, t: Sentence, backward=False):
         # print(f'Inference immediate\n{t}')
         results = []
@@ -225,14 +317,17 @@ class KanrenEngine:
     # STRUCTURAL #
     ##############
 
-    @cache_notify
+    # the theorems belong to the engine, so that they outlive the cache
+    @cache_notify(lambda t, theorem: (sentence_signature(t), id(theorem)))
     def inference_structural(self, t: Sentence, theorem):
         # print(f'Inference structural\n{t}')
         results = []
 
         l1 = logic(t.term, structural=True)
         (l2, sub_terms, matching_rules) = theorem
+        candidates = self.index_strong.ids(l1)
         for i in matching_rules:
+            if i not in candidates: continue
             rule = rules_strong[i] 
             res = self.apply(rule, l2, l1)
             if res is not None:
@@ -265,7 +360,7 @@ class KanrenEngine:
     # COMPOSITIONAL #
     #################
 
-    @cache_notify
+    @cache_notify(premises_signature)
     def inference_compositional(self, t1: Sentence, t2: Sentence):
         # print(f'Inference compositional\n{t1}\n{t2}')
         results = []
@@ -277,7 +372,7 @@ class KanrenEngine:
         
         l1 = logic(t1.term)
         l2 = logic(t2.term)
-        for rule in self.rules_conditional_compositional:
+        for rule in self.index_conditional_compositional(l1, l2):
             res = self.apply(rule, l1, l2)
             if res is not None:
                 r, _ = rule[1]
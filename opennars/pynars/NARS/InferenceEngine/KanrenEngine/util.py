@@ -1,7 +1,8 @@
 from kanren import run, eq, var, lall, lany
 from kanren.constraints import neq, ConstrainedVar
-from unification import unify, reify
+from unification import unify, reify, isvar
 from cons import cons, car, cdr
+from cons.core import ConsPair
 
 from itertools import combinations, product, chain, permutations
 
@@ -14,7 +15,9 @@ from pynars.NAL.Functions.Tools import project_truth, revisible
 from collections import defaultdict
 from typing import List
 
-from functools import cache
+from functools import lru_cache, wraps
+from pynars.Config import Config
+from pynars.utils.Cache import LRUCache, CacheInfo
 
 from time import time
 import yaml
@@ -115,22 +118,119 @@ def convert_immediate(rule):
 
     return ((p, c), (r, constraints))
 
-def convert_theorems(theorem):
+def convert_theorems(theorem, matching_rules=None):
+    '''`matching_rules`, the indices of the strong rules the theorem unifies with, is only worked out if not given'''
     # TODO: can we parse statements instead?
     t = parse(theorem+'.', True)
     l = logic(t, True, True, prefix='_theorem_')
 
-    matching_rules = []
-    for i, rule in enumerate(rules_strong):
-        (p1, p2, c) = rule[0]
-        res = run(1, (p2, c), eq(p1, l))
-        if res:
-            matching_rules.append(i)
+    if matching_rules is None:
+        matching_rules = []
+        for i, rule in enumerate(rules_strong):
+            (p1, p2, c) = rule[0]
+            res = run(1, (p2, c), eq(p1, l))
+            if res:
+                matching_rules.append(i)
 
     sub_terms = frozenset(filter(lambda x: x != place_holder, t.sub_terms))
     return (l, sub_terms, tuple(matching_rules))
 
 
+##############
+# RULE INDEX #
+##############
+
+# the leaves of a shape besides copulas and connectors
+any_shape = '*' # a variable, or what lies deeper than the shape goes
+atom_shape = 'atom' # any other atom
+
+def shape(l, depth: int=4):
+    '''
+    The outline of the logic form `l` down to `depth` pairs: nested (car, cdr) tuples, with the copulas and connectors kept.
+    Two logic forms can only unify if their shapes do (see `could_unify`).
+    '''
+    if isinstance(l, ConsPair):
+        if depth == 0: return any_shape
+        return (shape(l.car, depth-1), shape(l.cdr, depth-1))
+    if isvar(l): return any_shape
+    if type(l) is Copula or type(l) is Connector: return l
+    return atom_shape
+
+def could_unify(s1, s2) -> bool:
+    if s1 is any_shape or s2 is any_shape:
+        return True
+    if type(s1) is tuple:
+        return type(s2) is tuple and could_unify(s1[0], s2[0]) and could_unify(s1[1], s2[1])
+    return s1 == s2
+
+class RuleIndex:
+    '''
+    Narrows `rules` down to those whose premises could unify with given logic forms, by comparing shapes (see `shape`).
+    `positions` tells which parts of `rule[0]` the logic forms are matched against, e.g. (0, 2) for backward inference, which matches the first premise and the conclusion.
+    The candidates keep the order of `rules`, and are memoized by the shapes of the logic forms, of which there are only so many.
+    '''
+    def __init__(self, rules: list, positions: tuple=(0, 1)) -> None:
+        self.rules = rules
+        self.positions = positions
+        self.shapes = [tuple(shape(rule[0][i]) for i in positions) for rule in rules]
+        self._candidates = {}
+
+    def ids(self, *logics) -> tuple:
+        key = tuple(shape(l) for l in logics)
+        ids = self._candidates.get(key, None)
+        if ids is None:
+            ids = tuple(i for i, shapes in enumerate(self.shapes) if all(map(could_unify, shapes, key)))
+            self._candidates[key] = ids
+        return ids
+
+    def __call__(self, *logics) -> list:
+        rules = self.rules
+        return [rules[i] for i in self.ids(*logics)]
+
+
+###############
+# FIRST ORDER #
+###############
+
+def first_order(rule):
+    '''
+    The premises and the conclusion of `rule` as (copula, subject, predicate) triples, plus the pairs of its variables which must differ, if they are all statements between variables, as in {<M --> P>. <S --> M>} |- <S --> P>; else None.
+    Such rules are applied by `match_first_order`, without miniKanren.
+    '''
+    triples = []
+    for l in rule[0]:
+        if not (isinstance(l, ConsPair) and type(l.car) is Copula and isinstance(l.cdr, ConsPair) \
+            and isvar(l.cdr.car) and isvar(l.cdr.cdr)):
+            return None
+        triples.append((l.car, l.cdr.car, l.cdr.cdr))
+    (p1, p2, c) = triples
+    premise_vars = {p1[1], p1[2], p2[1], p2[2]}
+    if not {c[1], c[2]} <= premise_vars:
+        return None
+    # the same as the constraints made by `convert`
+    cond = lambda x, y: x.token.replace('_', '') != y.token.replace('_', '')
+    distinct = tuple((x, y) for x, y in combinations(premise_vars, 2) if cond(x, y))
+    return (p1, p2, c, distinct)
+
+def match_first_order(rule, l1, l2):
+    '''
+    The conclusion of a rule given by `first_order` from the logic forms of two premises without variables, as `run(1, c, eq((p1, p2), (l1, l2)), *constraints)` would give it, or None.
+    '''
+    (p1, p2, c, distinct) = rule
+    bindings = {}
+    for (copula, subject, predicate), l in ((p1, l1), (p2, l2)):
+        if not isinstance(l, ConsPair) or l.car != copula or not isinstance(l.cdr, ConsPair):
+            return None
+        for v, value in ((subject, l.cdr.car), (predicate, l.cdr.cdr)):
+            bound = bindings.setdefault(v, value)
+            if bound is not value and bound != value:
+                return None
+    for x, y in distinct:
+        if bindings[x] == bindings[y]:
+            return None
+    return cons(c[0], bindings[c[1]], bindings[c[2]])
+
+
 #################
 # TERM TO LOGIC #
 #################
@@ -176,8 +276,20 @@ def logic(term: Term, rule=False, substitution=False, var_intro=False, structura
 #################
 # LOGIC TO TERM #
 #################
-@cache
 def term(logic, root=True):
+    return _term_cached(logic, root)
+
+def set_term_cache_size(maxsize: int):
+    '''Bound the cache of `term` to `maxsize` entries (this empties it).'''
+    global _term_cached
+    _term_cached = lru_cache(maxsize=maxsize)(_term)
+
+def term_cache_info() -> CacheInfo:
+    info = _term_cached.cache_info()
+    # every miss stores an entry, which only leaves the cache when evicted
+    return CacheInfo(info.hits, info.misses, info.misses - info.currsize, info.currsize, info.maxsize)
+
+def _term(logic, root=True):
     # additional variable handling
     if root: vars_all.clear()
     def create_var(name, prefix: VarPrefix):
@@ -225,6 +337,8 @@ def term(logic, root=True):
         #     return term(car(logic))
     return logic # cons
 
+_term_cached = lru_cache(maxsize=Config.term_cache_size)(_term)
+
 def to_list(pair, con) -> list:
     l = [term(car(pair), False)]
     if type(cdr(pair)) is list and cdr(pair) == [] \
@@ -375,16 +489,30 @@ def diff(c):
 
 ########################################################################
 
-def cache_notify(func):
-    func = cache(func)
-    def notify_wrapper(*args, **kwargs):
-        stats = func.cache_info()
-        hits = stats.hits
-        results = func(*args, **kwargs)
-        stats = func.cache_info()
-        cached = False
-        if stats.hits > hits:
-            cached = True
-            # print(f"NOTE: {func.__name__}() results were cached")
-        return (results, cached)
-    return notify_wrapper
\ No newline at end of file
+def sentence_signature(s: Sentence) -> tuple:
+    '''What the inference from a sentence depends on, plus its evidence (see `cache_notify`).'''
+    stamp = s.stamp
+    return (s.term, s.punct, tuple(s.truth) if s.truth is not None else None, stamp.t_occurrence, hash(stamp.evidential_base))
+
+def premises_signature(*premises: Sentence) -> tuple:
+    return tuple(sentence_signature(s) for s in premises)
+
+def cache_notify(signature):
+    '''
+    Cache the results of an inference method of `KanrenEngine` in its bounded cache `self.caches[<method name>]`, keyed by `signature(*args, **kwargs)` instead of by the premises themselves, so that the cache neither grows without limit nor keeps the sentences alive.
+    The method then returns (results, cached). The reasoner drops cached results, since they come from premises that were already used; that is why the signatures include the evidential bases: the same content with new evidence gives new conclusions.
+    '''
+    def decorator(func):
+        name = func.__name__
+        @wraps(func)
+        def notify_wrapper(self, *args, **kwargs):
+            cache: LRUCache = self.caches[name]
+            key = signature(*args, **kwargs)
+            results = cache.get(key, None)
+            if results is not None:
+                return (results, True)
+            results = func(self, *args, **kwargs)
+            cache.put(key, results)
+            return (results, False)
+        return notify_wrapper
+    return decorator
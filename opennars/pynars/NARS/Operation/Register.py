@@ -1,7 +1,26 @@
+from collections.abc import MutableMapping
 from typing import Callable, Dict
 from pynars.Narsese._py.Operation import *
+from pynars import Global
 
-registered_operators: Dict[Operator, Callable] = {}
+class RegisteredOperators(MutableMapping):
+    '''The operators registered in the active `ReasonerContext`.'''
+    def __getitem__(self, operator: Operator) -> Callable:
+        return Global.context().operators[operator]
+
+    def __setitem__(self, operator: Operator, callable: Callable):
+        Global.context().operators[operator] = callable
+
+    def __delitem__(self, operator: Operator):
+        del Global.context().operators[operator]
+
+    def __iter__(self):
+        return iter(Global.context().operators)
+
+    def __len__(self):
+        return len(Global.context().operators)
+
+registered_operators: Dict[Operator, Callable] = RegisteredOperators()
 
 def registered_operator_names():
     ''''''
@@ -3,13 +3,12 @@ from typing import Any, Callable, Iterable, List, Tuple, Union
 from collections import OrderedDict
 
 
-from sparse_lut import SparseLUT
+from pynars.utils.RuleTable import RuleTable
 from pynars.Config import Enable
 
 from pynars.utils.Print import print_out, PrintType
 
 import time
-from datetime import datetime
 import sty
 
 
@@ -27,48 +26,29 @@ class RuleMap:
         '''
         self.structure = OrderedDict([(slot[0], tuple(slot[1:])) for slot in slots])
         shape = tuple([n_type for *_, n_type in slots])
-        self.map = SparseLUT(shape)
+        self.map = RuleTable(shape)
         pass
 
 
     def build(self, clear=True):
-        name_cache = self.name
+        '''Load the table saved for the rules added, which the table checks by their digest, or else build and save it.'''
         root_path = Path(__file__).parent
-        def check_update():
-            if self.root_rules is None: return True
-
-            cache_path = root_path/f'{name_cache}.pkl'
-            try:
-                if not cache_path.exists(): return True
-                # this_filepath = Path(__file__)
-                filepaths = Path(self.root_rules).glob("NAL*.py")
-                mtime_cache = datetime.fromtimestamp(cache_path.stat().st_mtime)
-                for filepath in filepaths:
-                    mtime_this = datetime.fromtimestamp(filepath.stat().st_mtime)
-                    if mtime_this > mtime_cache:
-                        return True
-                return False
-            except: 
-                if not cache_path.exists(): return True
-                else: return False
-                
-        if check_update():
+        if not self.load(str(root_path)):
             self.rebuild(root_path, clear)
-        else:
-            self.load(str(root_path))
 
         # if Enable.debug: out_print(PrintType.INFO, f'The size of map: {get_size(self.map.lut)/1024/1024:.6f}MB')
         
-    def load(self, root_path: str):
-        if Enable.debug: print_out(PrintType.INFO, f'Loading RuleMap <{self.name}.pkl>...')
+    def load(self, root_path: str) -> bool:
+        if Enable.debug: print_out(PrintType.INFO, f'Loading RuleMap <{self.name}.npz>...')
         t_start = time.time()
-        self.map.load(str(root_path), self.name)
+        loaded = self.map.load(str(root_path), self.name)
         t_end = time.time()
-        if Enable.debug: print_out(PrintType.INFO, f'Done. Time-cost: {t_end-t_start}s.')
+        if Enable.debug: print_out(PrintType.INFO, f'Done. Time-cost: {t_end-t_start}s.' if loaded else 'Not found or outdated.')
+        return loaded
 
     def rebuild(self, root_path: str, clear=True):
         ''''''
-        if Enable.debug: print_out(PrintType.INFO, f'Building RuleMap <{self.name}.pkl>...')
+        if Enable.debug: print_out(PrintType.INFO, f'Building RuleMap <{self.name}.npz>...')
         t_start = time.time()
         self.map.build(clear)
         t_end = time.time()
@@ -79,7 +59,11 @@ class RuleMap:
 
 
     def draw(self, show_labels=True):
-        self.map.draw(show_labels)
+        '''Print the rules, one per line, with the indices of each slot (labelled with the name of the slot if `show_labels`).'''
+        names = list(self.structure.keys())
+        for indices, rule in self.map.data:
+            slots = (f'{name}={index}' if show_labels else str(index) for name, index in zip(names, indices))
+            print(f"{getattr(rule, '__name__', rule)}: {', '.join(slots)}")
 
     def diagnose(self, indices):
         '''
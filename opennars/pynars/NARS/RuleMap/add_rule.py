@@ -18,7 +18,7 @@ from pynars.Narsese._py.Term import Term
 from pynars.Narsese import Belief, Term, Truth, Compound, Budget
 from ..DataStructures import LinkType, TaskLink, TermLink
 from pynars.NAL.Inference import *
-from sparse_lut import SparseLUT
+from pynars.utils.RuleTable import RuleTable
 from pynars.utils.tools import get_size
 
 from pynars.utils.Print import print_out, PrintType
@@ -178,7 +178,7 @@ def _common(premise1: Statement, premise2: Statement):
 
 
 
-def add_rule(sparse_lut: SparseLUT, structure: OrderedDict, rules: List[RuleCallable],**kwargs):
+def add_rule(sparse_lut: RuleTable, structure: OrderedDict, rules: List[RuleCallable],**kwargs):
         ''''''
         indices = [kwargs.get(key, None) for key in structure.keys()]
 
@@ -1 +1 @@
-from .Control import Reasoner
\ No newline at end of file
+from .Control import Reasoner, ReasonerContext
\ No newline at end of file
@@ -1,7 +1,11 @@
 from pynars.Narsese import Term, Judgement, Tense, Statement, Copula, Truth, Stamp, Interval
 from pynars.Narsese import Base, Operator, Budget, Task, Goal, Punctuation, Question, Quest, Sentence, VarPrefix, Variable, Connector, Compound, SELF
 from pathlib import Path
-from datetime import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
 from pynars import Config, Global
 from collections import defaultdict
 
@@ -10,21 +14,36 @@ narsese_path = root_path/Path('./narsese.lark')
 
 
 narsese_py_path = root_path/Path('./narsese_lark.py')
-# get the last modified time of the file
-mtime_lark = datetime.fromtimestamp(narsese_path.stat().st_mtime)
-mtime_py = datetime.fromtimestamp(narsese_py_path.stat().st_mtime)
-if mtime_lark > mtime_py:
-    # re-generate the ``nasese_lark.py'' file
-    import os
+
+def generate_parser():
+    '''(Re-)generate ``narsese_lark.py'' from the grammar; run `python -m pynars.Narsese.Parser.parser` after editing ``narsese.lark''.'''
     print(f'generating [{narsese_py_path}] ...')
-    os.system(f'python -m lark.tools.standalone {narsese_path} > {narsese_py_path}')
+    # into a temporary file first, so that a failed or interrupted generation leaves the module as it was
+    fd, path_tmp = tempfile.mkstemp(dir=root_path, prefix='narsese_lark.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            subprocess.run([sys.executable, '-m', 'lark.tools.standalone', str(narsese_path)], stdout=f, check=True)
+        os.replace(path_tmp, narsese_py_path)
+    finally:
+        if os.path.exists(path_tmp): os.remove(path_tmp)
+
+# the generated module is part of the package, so it is only generated at import time if it is missing; a stale one is only warned about
+if not narsese_py_path.exists():
+    generate_parser()
+elif narsese_path.stat().st_mtime > narsese_py_path.stat().st_mtime:
+    warnings.warn(f'[{narsese_path.name}] is newer than [{narsese_py_path.name}]; run `python -m pynars.Narsese.Parser.parser` to re-generate it.')
 
-import sys
 try:
     from .narsese_lark import Lark_StandAlone, Transformer, v_args, Token
 except:
-    print('Wrong generation.')
-    exit()
+    # e.g. left empty or partial by an older version of `generate_parser`; generate it again once
+    try:
+        generate_parser()
+        sys.modules.pop(f'{__package__}.narsese_lark', None)
+        from .narsese_lark import Lark_StandAlone, Transformer, v_args, Token
+    except:
+        print('Wrong generation.')
+        exit()
 inline_args = v_args(inline=True)
 
 
@@ -506,4 +525,7 @@ def parse(text: str): return parser.parse(text)
 
 # if __name__ == '__main__':
 #     with open(sys.argv[1]) as f:
-#         print(parser.parse(f.read()))
\ No newline at end of file
+#         print(parser.parse(f.read()))
+
+if __name__ == '__main__':
+    generate_parser()
@@ -0,0 +1,112 @@
+import re
+from typing import Dict, Tuple
+
+from pynars.Narsese import Judgement, Goal, Question, Quest, Punctuation, Truth, Stamp, Base, Budget, Task
+from pynars import Global
+from .parser import parser as _parser, TreeToNarsese
+
+_UNSET = object()
+
+# a trailing truth-value, e.g. " %0.5;0.9%"
+_truth_pattern = re.compile(r'\s*%\s*([^%;\s]+)\s*(?:;\s*([^%;\s]+)\s*)?(?:;\s*([^%;\s]+)\s*)?%\s*$')
+
+
+class Template:
+    '''
+    A sentence that is parsed only once and then instantiated as many times as needed.
+
+    The term of the sentence is shared by all the instances; only the truth-value, the tense and the stamp are new for each task. E.g.
+        good = Template('<{SELF} --> [good]>. :|:')
+        task = good.task(0.8, 0.9)
+    gives the same task as `parser.parse('<{SELF} --> [good]>. :|: %0.8;0.9%')`, without running the parser again.
+    '''
+
+    def __init__(self, text: str, parser=_parser) -> None:
+        ''''''
+        task: Task = parser.parse(text)
+        sentence = task.sentence
+        self.text = text
+        self.term = task.term
+        self.punct: Punctuation = sentence.punct
+
+        truth: Truth = sentence.truth
+        self.truth = (truth.f, truth.c, truth.k) if truth is not None else None
+
+        stamp: Stamp = sentence.stamp
+        self.tense = stamp.t_occurrence - stamp.t_creation if stamp.t_occurrence is not None else None
+
+        # only an explicit budget is kept, otherwise it is derived from the truth-value of each instance
+        self.budget = (task.budget.priority, task.budget.durability, task.budget.quality) if text.lstrip().startswith('$') else None
+
+
+    def task(self, f: float=None, c: float=None, k: float=None, tense=_UNSET, budget: Tuple[float, float, float]=None, stamp: Stamp=None) -> Task:
+        '''
+        Args:
+            f, c, k: the truth-value (or desire-value); the ones not given are taken from the template.
+            tense: the occurrence time relative to `Global.time`, or None for an eternal sentence; taken from the template if not given.
+            budget: (priority, durability, quality); taken from the template, or derived like the parser does, if not given.
+            stamp: a ready-made stamp. If not given, a new one is created with a new input id, as the parser does.
+        '''
+        if stamp is None:
+            tense = self.tense if tense is _UNSET else tense
+            t_occurrence = Global.time + tense if tense is not None else None
+            stamp = Stamp(Global.time, t_occurrence, None, Base((Global.get_input_id(),)))
+
+        punct = self.punct
+        if punct == Punctuation.Judgement or punct == Punctuation.Goal:
+            f0, c0, k0 = self.truth
+            truth = Truth(f0 if f is None else f, c0 if c is None else c, k0 if k is None else k)
+            if punct == Punctuation.Judgement:
+                sentence = Judgement(self.term, stamp=stamp, truth=truth)
+            else:
+                sentence = Goal(self.term, stamp=stamp, desire=truth)
+        elif punct == Punctuation.Question:
+            sentence = Question(self.term, stamp=stamp)
+        else:
+            sentence = Quest(self.term, stamp=stamp)
+
+        budget = budget or self.budget
+        if budget is None:
+            if punct == Punctuation.Judgement:
+                budget = (TreeToNarsese.p_judgement, TreeToNarsese.d_judgement, Budget.quality_from_truth(sentence.truth))
+            elif punct == Punctuation.Goal:
+                budget = (TreeToNarsese.p_goal, TreeToNarsese.d_goal, Budget.quality_from_truth(sentence.truth))
+            elif punct == Punctuation.Question:
+                budget = (TreeToNarsese.p_question, TreeToNarsese.d_question, 1.0)
+            else:
+                budget = (TreeToNarsese.p_quest, TreeToNarsese.d_quest, 1.0)
+        return Task(sentence, Budget(*budget))
+
+    __call__ = task
+
+    def __repr__(self) -> str:
+        return f'<Template: {self.text}>'
+
+
+class TemplateCache:
+    '''
+    A drop-in replacement of `parser.parse` for inputs drawn from a small, fixed vocabulary.
+
+    The text is split into a skeleton and its trailing truth-value; the skeleton is parsed once, into a `Template`, and every later input with the same skeleton is instantiated from that template, e.g. "<{SELF} --> [good]>. %0.3;0.9%" and "<{SELF} --> [good]>. %0.7;0.9%" share one template.
+    '''
+
+    def __init__(self, parser=_parser) -> None:
+        ''''''
+        self.parser = parser
+        self.templates: Dict[str, Template] = {}
+
+    def get(self, skeleton: str) -> Template:
+        template = self.templates.get(skeleton, None)
+        if template is None:
+            template = Template(skeleton, self.parser)
+            self.templates[skeleton] = template
+        return template
+
+    def parse(self, text: str) -> Task:
+        match = _truth_pattern.search(text)
+        if match is None:
+            return self.get(text.strip()).task()
+        f, c, k = match.groups()
+        template = self.get(text[:match.start()].strip())
+        c = float(c) if c is not None else TreeToNarsese.c_goal if template.punct == Punctuation.Goal else TreeToNarsese.c_judgement
+        return template.task(float(f), c, float(k) if k is not None else TreeToNarsese.k)
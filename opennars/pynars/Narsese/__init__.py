@@ -9,3 +9,4 @@ else:
     pass
 
 from .Parser.parser import parser, parse
+from .Parser.template import Template, TemplateCache
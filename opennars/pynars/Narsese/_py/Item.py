@@ -6,6 +6,7 @@ class Item:
     def __init__(self, hash_value, budget: Budget=None, copy_budget=True) -> None:
         budget = (deepcopy(budget) if copy_budget else budget) if budget is not None else Budget(Config.priority, Config.durability, Config.quality)
         self._hash_value = hash_value
+        self.key: int = hash_value # the key of the item in a keyed bag, see `Bag.LUT`
         self.set_budget(budget)
 
     def set_budget(self, budget: Budget):
@@ -20,6 +20,8 @@ class Task(Item):
     def __init__(self, sentence: Sentence, budget: Budget=None, input_id: int=None) -> None:
         super().__init__(hash(sentence), budget)
         self.sentence: Sentence = sentence
+        # the same sentence with another evidential base is another task in a buffer; the key is computed once here, so the base is not re-hashed on every look-up
+        self.key: int = hash((self._hash_value, hash(sentence.evidential_base)))
         self.input_id = self.input_id if input_id is None else input_id
 
     @property
@@ -11,13 +11,39 @@ from bidict import bidict
 from pynars.utils.IndexVar import IntVar
 from typing import Callable
 from typing import Tuple
+from weakref import WeakValueDictionary
 
 class TermType(Enum):
     ATOM = 0
     STATEMENT = 1
     COMPOUND = 2
 
-class Term:
+class Interning(type):
+    '''
+    Hash-consing of terms.
+    A term without variables is never changed once it is built (see `Term.clone`), so all the structurally identical ones can share a single instance: constructing a term that is identical to one still alive returns that one. The tables only hold weak references, so a term is dropped once nothing else uses it.
+    Terms with variables are not interned, since their variable indices are changed in place.
+    '''
+    by_arguments = WeakValueDictionary() # (class, arguments) -> term, so that a term built again from the same components is not built at all
+    by_word = WeakValueDictionary() # (class, word, is_mental_operation) -> term
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            # terms are keyed by identity (the term itself is kept in the key so that its id is not reused)
+            key = (cls, tuple((id(arg), arg) if isinstance(arg, Term) else arg for arg in args), tuple(sorted(kwargs.items())))
+            term = Interning.by_arguments.get(key, None)
+        except TypeError: # unhashable arguments
+            key, term = None, None
+        if term is not None: return term
+
+        term = super().__call__(*args, **kwargs)
+        if term.has_var: return term
+        term = Interning.by_word.setdefault((cls, term.word, term.is_mental_operation), term)
+        if key is not None: Interning.by_arguments[key] = term
+        return term
+
+
+class Term(metaclass=Interning):
 
     type = TermType.ATOM
     copula: Copula = None
@@ -119,7 +145,7 @@ class Term:
         return False
 
     def identical(self, o: Type['Term']) -> bool:
-        return hash(o) == hash(self) # and hash(o.index_var) == hash(self.index_var)
+        return self is o or hash(o) == hash(self) # and hash(o.index_var) == hash(self.index_var)
 
     def equal(self, o: Type['Term']) -> bool:
         '''
@@ -153,6 +179,7 @@ class Term:
         return self._hash_value if self._hash_value is not None else self.do_hashing()
     
     def __eq__(self, o: Type['Term']) -> bool:
+        if self is o: return True
         return self.identical(o) and self._vars_independent.indices == o._vars_independent.indices and self._vars_dependent.indices == o._vars_dependent.indices and self._vars_query.indices == o._vars_query.indices
 
     def __contains__(self, term: Type['Term']) -> bool:
@@ -220,6 +247,13 @@ class Term:
         # clone = copy(self)
         return self
 
+    def __deepcopy__(self, memo):
+        if not self.has_var: return self # shared, see `Interning`
+        clone = self.__class__.__new__(self.__class__)
+        memo[id(self)] = clone
+        clone.__dict__.update(deepcopy(self.__dict__, memo))
+        return clone
+
     def _normalize_variables(self):
         ''''''
         if self.has_var:
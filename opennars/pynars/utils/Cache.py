@@ -0,0 +1,60 @@
+from collections import OrderedDict, namedtuple
+from time import monotonic
+from typing import Any, Hashable
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'size', 'maxsize'])
+
+_missing = object()
+
+class LRUCache:
+    '''
+    A bounded mapping, which evicts its least recently used entry when it is full, and, if `ttl` is given, the entries older than `ttl` seconds.
+    It counts its hits, misses and evictions (see `info`).
+    '''
+    def __init__(self, maxsize: int=1024, ttl: float=None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict() # key -> (value, time stored)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any=None) -> Any:
+        entry = self._data.get(key, _missing)
+        if entry is _missing:
+            self.misses += 1
+            return default
+        value, t = entry
+        if self.ttl is not None and monotonic() - t > self.ttl:
+            del self._data[key]
+            self.evictions += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        data = self._data
+        if key in data:
+            data.move_to_end(key)
+        data[key] = (value, monotonic() if self.ttl is not None else None)
+        while len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+    @property
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._data), self.maxsize)
+
+    def __repr__(self) -> str:
+        return f'<LRUCache: {self.info}>'
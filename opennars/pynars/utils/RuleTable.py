@@ -0,0 +1,151 @@
+import os
+import tempfile
+import zipfile
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Hashable, Tuple, Union
+import numpy as np
+from ordered_set import OrderedSet
+
+_missing = object()
+
+class RuleTable:
+    '''
+    A look-up table from keys, i.e. tuples of indices (int or None), to the ordered sets of values added for them; it has the interface of `SparseLUT`, which it replaces.
+    An entry is added with, for each slot of the key, an index, a list of indices, or `Any`/`None` for all of `range(shape[i])` and None.
+
+    The table is a boolean numpy array `masks` with one row per slot and index, in mixed-radix order (the slots one after another, each with its indices and then None as an extra digit), and one column per entry: looking a key up ANDs the rows of its indices, and gathers the values of the entries left, in the order they were added. The results are memoized by key.
+    The array is saved to an `.npz` file along with a digest of the entries, and only loaded back for the same entries.
+    '''
+    def __init__(self, shape: tuple) -> None:
+        self.shape = tuple(shape)
+        self.depth = len(self.shape) - 1
+        self.data = [] # (indices, value), in the order added
+        self.domains: Tuple[Tuple[Union[int, None]]] = None # the indices of each slot, None last
+        self.masks: np.ndarray = None
+        self._rows = None # for each slot, index -> bitmask of the entries
+        self._lut = {}
+
+    def add(self, indices: Union[list, tuple], value):
+        self.data.append((tuple(indices), value))
+
+    def _normalize(self, i: int, index) -> frozenset:
+        if isinstance(index, int):
+            return frozenset((index,))
+        elif isinstance(index, (list, tuple)):
+            return frozenset(index)
+        elif index is Any or index is None:
+            return frozenset((*range(self.shape[i]), None))
+        else:
+            raise TypeError(f'Invalid index {index!r} in slot {i}.')
+
+    def build(self, clear=True):
+        entries = [[self._normalize(i, index) for i, index in enumerate(indices)] for indices, _ in self.data]
+        domains = []
+        for i, n in enumerate(self.shape):
+            # indices beyond the declared shape may still be given explicitly
+            extra = sorted(set().union(*(entry[i] for entry in entries)) - set(range(n)) - {None})
+            domains.append((*range(n), *extra, None))
+        rows = [] # for each slot, index -> row
+        n_rows = 0
+        for domain in domains:
+            rows.append({index: row for row, index in enumerate(domain, n_rows)})
+            n_rows += len(domain)
+        masks = np.zeros((n_rows, len(entries)), dtype=bool)
+        for j, entry in enumerate(entries):
+            for rows_slot, indices in zip(rows, entry):
+                masks[[rows_slot[index] for index in indices], j] = True
+        self._set(tuple(domains), masks)
+
+    def _set(self, domains: tuple, masks: np.ndarray):
+        self.domains = domains
+        self.masks = masks
+        self._rows = []
+        row = 0
+        for domain in domains:
+            rows = {}
+            for index in domain:
+                bits = np.packbits(masks[row], bitorder='little').tobytes()
+                rows[index] = int.from_bytes(bits, 'little')
+                row += 1
+            self._rows.append(rows)
+        self._lut.clear()
+
+    def digest(self) -> str:
+        '''A digest of the shape and the entries, which tells whether a saved table still fits them.'''
+        h = sha256(repr(self.shape).encode())
+        for indices, value in self.data:
+            name = f'{getattr(value, "__module__", "")}.{getattr(value, "__qualname__", repr(value))}'
+            h.update(repr((indices, name)).encode())
+        return h.hexdigest()
+
+    def clear(self):
+        self.domains = self.masks = self._rows = None
+        self._lut.clear()
+
+    def dump(self, root_path: str, name_cache: str='LUT') -> bool:
+        '''Save the table, through a temporary file so that no reader sees it half written; return False if it cannot be written, e.g. in a read-only install.'''
+        domains = np.array([-1 if index is None else index for domain in self.domains for index in domain], dtype=np.int64)
+        lengths = np.array([len(domain) for domain in self.domains], dtype=np.int64)
+        path = Path(root_path)/f'{name_cache}.npz'
+        try:
+            fd, path_tmp = tempfile.mkstemp(dir=root_path, prefix=f'{name_cache}.', suffix='.tmp')
+        except OSError:
+            return False
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                np.savez(file, masks=self.masks, domains=domains, lengths=lengths, digest=np.array(self.digest()))
+            os.replace(path_tmp, path)
+        except OSError:
+            if os.path.exists(path_tmp): os.remove(path_tmp)
+            return False
+        return True
+
+    def load(self, root_path: str, name_cache: str='LUT') -> bool:
+        '''Load the table saved for the same entries; return False, leaving the table as it is, if there is none or it cannot be read.'''
+        path = Path(root_path)/f'{name_cache}.npz'
+        if not path.exists(): return False
+        try:
+            with np.load(path, allow_pickle=False) as file:
+                if str(file['digest']) != self.digest(): return False
+                masks, domains, lengths = file['masks'], file['domains'].tolist(), file['lengths'].tolist()
+        except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        if masks.shape[1] != len(self.data) or len(lengths) != len(self.shape) or sum(lengths) != masks.shape[0]: return False
+        splits = np.cumsum([0] + lengths)
+        self._set(tuple(tuple(None if index == -1 else index for index in domains[a:b]) for a, b in zip(splits[:-1], splits[1:])), masks)
+        return True
+
+    def __setitem__(self, indices: tuple, value):
+        self.add(indices, value)
+
+    def get(self, indices: tuple):
+        '''
+        each item in indices should be int, Any/None. A key shorter than the shape only constrains its first slots.
+        '''
+        values = self._lut.get(indices, _missing)
+        if values is not _missing: return values
+
+        mask = -1
+        for rows, index in zip(self._rows, indices):
+            if index is Any: index = None
+            mask &= rows.get(index, 0)
+            if not mask: break
+        if mask:
+            data = self.data
+            values = OrderedSet()
+            while mask:
+                lowest = mask & -mask
+                mask ^= lowest
+                values.add(data[lowest.bit_length() - 1][1])
+        else:
+            values = None
+        self._lut[indices] = values
+        return values
+
+    def __getitem__(self, indices: tuple):
+        if isinstance(indices, int): indices = (indices,)
+        return self.get(indices)
+
+    def __len__(self):
+        return len(self.data)
@@ -1,4 +0,0 @@
-import warnings
-
-from sparse_lut import SparseLUT # Directly import as an outer module that can let PyNARS run in Python 3.11
-from typing import Any
\ No newline at end of file
@@ -29,7 +29,6 @@ setup(
     include_package_data=True,
     package_data={
         '': ['*.json', '*.lark', '*.txt'], 
-        'pynars.utils.SparseLUT': ['*.pyd', '*.pyi'], 
         },
     license="MIT",
     keywords=['NARS', 'Non-Axiomatic Reasoning System', 'NAL', 'Non-Axiomatic Logic', 'Narsese'],
@@ -0,0 +1,124 @@
+import datetime
+from typing import Dict
+
+import numpy as np
+
+from src.data_fetchers.bar_store import BAR_COLUMNS, bars_to_columns, to_utc_ns
+
+
+class BarSeries:
+    """
+    A time series of bars stored as contiguous NumPy arrays instead of per-bar Python objects.
+
+    Attributes:
+        index (np.ndarray): Bar opening times as `datetime64[ns]` (UTC).
+        open, high, low, close, volume, vwap (np.ndarray): float64 columns.
+        trade_count (np.ndarray): int64 column.
+
+    Slicing (by position or by time range) returns a new `BarSeries` whose columns are views
+    of the original arrays, so no bar data is copied.
+    """
+
+    __slots__ = ("symbol", "_columns")
+
+    def __init__(self, symbol: str, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Args:
+            symbol (str): Ticker symbol the bars belong to.
+            columns (dict): A mapping of column name to array (see `BAR_COLUMNS`), sorted by timestamp.
+
+        Raises:
+            ValueError: If a column is missing or the columns differ in length.
+        """
+        missing = [name for name in BAR_COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Missing bar columns: {missing}")
+        lengths = {len(columns[name]) for name in BAR_COLUMNS}
+        if len(lengths) > 1:
+            raise ValueError("All bar columns must have the same length.")
+
+        self.symbol = symbol
+        self._columns = {name: columns[name] for name in BAR_COLUMNS}
+
+    @classmethod
+    def from_barset(cls, barset, symbol: str) -> "BarSeries":
+        """
+        Converts the bars of one symbol in an Alpaca `BarSet` in a single pass.
+
+        Args:
+            barset (BarSet): The bars keyed by symbol.
+            symbol (str): The symbol to extract.
+
+        Returns:
+            BarSeries: The converted series.
+        """
+        return cls(symbol, bars_to_columns(barset.data.get(symbol, [])))
+
+    @property
+    def index(self) -> np.ndarray:
+        return self._columns["timestamp"].view("datetime64[ns]")
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._columns["timestamp"]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._columns["open"]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._columns["high"]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._columns["low"]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._columns["close"]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._columns["volume"]
+
+    @property
+    def trade_count(self) -> np.ndarray:
+        return self._columns["trade_count"]
+
+    @property
+    def vwap(self) -> np.ndarray:
+        return self._columns["vwap"]
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return dict(self._columns)
+
+    def between(self, start: datetime.datetime, end: datetime.datetime) -> "BarSeries":
+        """
+        Returns the bars within `[start, end]` without copying.
+
+        Args:
+            start (datetime): Start of the range (inclusive). Naive datetimes are treated as UTC.
+            end (datetime): End of the range (inclusive). Naive datetimes are treated as UTC.
+
+        Returns:
+            BarSeries: A view on this series.
+        """
+        timestamps = self._columns["timestamp"]
+        lo = np.searchsorted(timestamps, to_utc_ns(start), side="left")
+        hi = np.searchsorted(timestamps, to_utc_ns(end), side="right")
+        return self[lo:hi]
+
+    def __getitem__(self, item: slice) -> "BarSeries":
+        if not isinstance(item, slice):
+            raise TypeError("BarSeries only supports slicing; index the columns for single bars.")
+        return BarSeries(self.symbol, {name: column[item] for name, column in self._columns.items()})
+
+    def __len__(self) -> int:
+        return len(self._columns["timestamp"])
+
+    def __repr__(self) -> str:
+        if len(self) == 0:
+            return f"<BarSeries {self.symbol}: empty>"
+        return f"<BarSeries {self.symbol}: {len(self)} bars, {self.index[0]} .. {self.index[-1]}>"
@@ -0,0 +1,251 @@
+import os
+import json
+import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+# Column name -> dtype. Timestamps are nanoseconds since the Unix epoch (UTC).
+BAR_COLUMNS = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "trade_count": np.int64,
+    "vwap": np.float64,
+}
+
+_META_FILE = "meta.json"
+
+
+def to_utc_ns(moment: datetime.datetime) -> int:
+    """
+    Converts a datetime into nanoseconds since the Unix epoch.
+    Naive datetimes are interpreted as UTC, which is what Alpaca assumes as well.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    delta = moment - datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def from_utc_ns(ns: int) -> datetime.datetime:
+    """Converts nanoseconds since the Unix epoch into an aware UTC datetime."""
+    return datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(
+        microseconds=int(ns) // 1_000
+    )
+
+
+def bars_to_columns(bars: Iterable) -> Dict[str, np.ndarray]:
+    """
+    Converts a sequence of Alpaca `Bar` objects into typed columns in a single pass.
+
+    Missing `trade_count` values are stored as 0 and missing `vwap` values as NaN.
+
+    Args:
+        bars (Iterable[Bar]): The bars to convert.
+
+    Returns:
+        dict: A mapping of column name to a contiguous array (see `BAR_COLUMNS`).
+    """
+    rows = [
+        (
+            to_utc_ns(b.timestamp),
+            b.open,
+            b.high,
+            b.low,
+            b.close,
+            b.volume,
+            b.trade_count if b.trade_count is not None else 0,
+            b.vwap if b.vwap is not None else np.nan,
+        )
+        for b in bars
+    ]
+    columns = {}
+    for i, (name, dtype) in enumerate(BAR_COLUMNS.items()):
+        columns[name] = np.fromiter((row[i] for row in rows), dtype=dtype, count=len(rows))
+    return columns
+
+
+def empty_columns() -> Dict[str, np.ndarray]:
+    """Returns a set of zero-length columns."""
+    return {name: np.empty(0, dtype=dtype) for name, dtype in BAR_COLUMNS.items()}
+
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorts half-open `[start, end)` ranges and merges the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(ranges):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(start: int, end: int, covered: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Returns the parts of `[start, end)` that are not inside any of the `covered` ranges."""
+    missing = []
+    cursor = start
+    for c_start, c_end in merge_ranges(covered):
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            missing.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class BarStore:
+    """
+    An on-disk, columnar store of historical bars keyed by (symbol, timeframe).
+
+    Each (symbol, timeframe) pair lives in its own directory holding one `.npy` file per column
+    (see `BAR_COLUMNS`) plus a `meta.json` file that records which time ranges have already been
+    fetched. Columns are opened memory-mapped, so reading a cached series does not copy it into memory.
+    Coverage is tracked separately from the bars themselves, since weekends and holidays legitimately
+    contain no bars and must not be re-requested.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Args:
+            root (str): Directory under which all series are stored. Created on first write.
+        """
+        self._root = root
+
+    def _series_dir(self, symbol: str, timeframe) -> str:
+        return os.path.join(self._root, symbol.upper(), str(timeframe))
+
+    def coverage(self, symbol: str, timeframe) -> List[Tuple[int, int]]:
+        """
+        Returns the fetched time ranges of a series.
+
+        Args:
+            symbol (str): Ticker symbol.
+            timeframe (TimeFrame): The time frame of the bars.
+
+        Returns:
+            list: Merged half-open `[start, end)` ranges in nanoseconds since the epoch.
+        """
+        path = os.path.join(self._series_dir(symbol, timeframe), _META_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            meta = json.load(f)
+        return [tuple(r) for r in meta.get("coverage", [])]
+
+    def missing_ranges(
+        self, symbol: str, timeframe, start: datetime.datetime, end: datetime.datetime
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Returns the parts of `[start, end)` that have not been fetched yet.
+
+        Args:
+            symbol (str): Ticker symbol.
+            timeframe (TimeFrame): The time frame of the bars.
+            start (datetime): Start of the requested range.
+            end (datetime): End of the requested range.
+
+        Returns:
+            list: `(start, end)` pairs of aware UTC datetimes.
+        """
+        missing = subtract_ranges(to_utc_ns(start), to_utc_ns(end), self.coverage(symbol, timeframe))
+        return [(from_utc_ns(s), from_utc_ns(e)) for s, e in missing]
+
+    def load(self, symbol: str, timeframe) -> Dict[str, np.ndarray]:
+        """
+        Opens every column of a series memory-mapped and read-only.
+
+        Args:
+            symbol (str): Ticker symbol.
+            timeframe (TimeFrame): The time frame of the bars.
+
+        Returns:
+            dict: A mapping of column name to array, sorted by timestamp. Empty if nothing is stored.
+        """
+        directory = self._series_dir(symbol, timeframe)
+        if not os.path.exists(os.path.join(directory, "timestamp.npy")):
+            return empty_columns()
+        return {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in BAR_COLUMNS
+        }
+
+    def read(
+        self, symbol: str, timeframe, start: datetime.datetime, end: datetime.datetime
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns the stored bars within `[start, end]` as memory-mapped slices.
+
+        Args:
+            symbol (str): Ticker symbol.
+            timeframe (TimeFrame): The time frame of the bars.
+            start (datetime): Start of the range (inclusive).
+            end (datetime): End of the range (inclusive).
+
+        Returns:
+            dict: A mapping of column name to array.
+        """
+        columns = self.load(symbol, timeframe)
+        timestamps = columns["timestamp"]
+        lo = np.searchsorted(timestamps, to_utc_ns(start), side="left")
+        hi = np.searchsorted(timestamps, to_utc_ns(end), side="right")
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def write(
+        self,
+        symbol: str,
+        timeframe,
+        columns: Dict[str, np.ndarray],
+        fetched: Iterable[Tuple[datetime.datetime, datetime.datetime]],
+    ) -> None:
+        """
+        Merges newly fetched bars into a series and records the ranges they were fetched for.
+
+        Bars with a timestamp that is already stored replace the stored ones. Every file is
+        written to a temporary path first and then moved into place, so readers never observe a
+        partially written column.
+
+        Args:
+            symbol (str): Ticker symbol.
+            timeframe (TimeFrame): The time frame of the bars.
+            columns (dict): The new bars, as returned by `bars_to_columns`.
+            fetched (Iterable[tuple]): The `(start, end)` datetime ranges that were requested.
+        """
+        directory = self._series_dir(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+
+        stored = self.load(symbol, timeframe)
+        merged = {name: np.concatenate((columns[name], stored[name])) for name in BAR_COLUMNS}
+        # `np.unique` keeps the first occurrence, which is the freshly fetched bar.
+        _, keep = np.unique(merged["timestamp"], return_index=True)
+        merged = {name: np.ascontiguousarray(column[keep]) for name, column in merged.items()}
+
+        coverage = merge_ranges(
+            self.coverage(symbol, timeframe) + [(to_utc_ns(s), to_utc_ns(e)) for s, e in fetched]
+        )
+
+        # drop the memory maps before replacing the files they point to
+        del stored
+        for name, column in merged.items():
+            path = os.path.join(directory, f"{name}.npy")
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, column)
+            os.replace(path + ".tmp", path)
+
+        path = os.path.join(directory, _META_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"symbol": symbol.upper(), "timeframe": str(timeframe), "coverage": coverage}, f)
+        os.replace(path + ".tmp", path)
@@ -1,10 +1,23 @@
 import os
 import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
 from alpaca.trading.client import TradingClient
 from alpaca.trading.enums import AssetClass
 from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.timeframe import TimeFrame
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 from alpaca.data.requests import StockBarsRequest
+from alpaca.data.models import BarSet
+
+from src.data_fetchers.bar_store import BarStore, BAR_COLUMNS, bars_to_columns, from_utc_ns, to_utc_ns
+from src.data_fetchers.bar_series import BarSeries
+
+# daily and longer bars follow the exchange's calendar
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+# how long after the fact Alpaca's historical data may still change, e.g. the 15 minute delay of SIP data
+DATA_DELAY = datetime.timedelta(minutes=15)
 
 
 class HistoricalDataFetcher:
@@ -14,7 +27,16 @@ class HistoricalDataFetcher:
     convenience methods to subscribe/unsubscribe to specific event streams.
     """
 
-    def __init__(self, api_key: str, secret_key: str, symbol: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        symbol: str,
+        store: BarStore = None,
+        client: StockHistoricalDataClient = None,
+        validate_symbol: bool = True,
+        data_delay: datetime.timedelta = DATA_DELAY,
+    ) -> None:
         """
         Instantiates a WebSocket client for accessing live financial data.
 
@@ -22,6 +44,11 @@ class HistoricalDataFetcher:
             api_key (str): Alpaca API key.
             secret_key (str): Alpaca API secret key.
             symbol (str): Ticker symbol to subscribe to.
+            store (BarStore): Optional local bar cache. If given, only the date ranges missing from
+                the store are requested from Alpaca.
+            client (StockHistoricalDataClient): Optional pre-built data client, e.g. a stub for offline use.
+            validate_symbol (bool): Whether to check the symbol against the Alpaca trading API.
+            data_delay (timedelta): How long before now bars are still not final, besides the bar that is forming.
 
         Raises:
             ValueError: If API keys are missing or if the symbol is not valid.
@@ -31,23 +58,48 @@ class HistoricalDataFetcher:
             raise ValueError("API key and secret key are required.")
 
         # Checks if the provided symbol is valid
-        trading_client = TradingClient(api_key, secret_key, paper=True)
-        try:
-            asset = trading_client.get_asset(symbol_or_asset_id=symbol)
-            if asset.asset_class != AssetClass.US_EQUITY:
-                raise ValueError(f"Invalid asset class for symbol: {symbol}")
-        except Exception as e:
-            raise ValueError(f"A valid symbol is required. Error: {e}")
+        if validate_symbol:
+            trading_client = TradingClient(api_key, secret_key, paper=True)
+            try:
+                asset = trading_client.get_asset(symbol_or_asset_id=symbol)
+                if asset.asset_class != AssetClass.US_EQUITY:
+                    raise ValueError(f"Invalid asset class for symbol: {symbol}")
+            except Exception as e:
+                raise ValueError(f"A valid symbol is required. Error: {e}")
 
         self._symbol = symbol
-        self._client = StockHistoricalDataClient(api_key, secret_key)
+        self._store = store
+        self._client = client if client is not None else StockHistoricalDataClient(api_key, secret_key)
+        self._data_delay = data_delay
 
     def retrieve_historical_bar_data(
         self, timeframe: TimeFrame, start: datetime.datetime, end: datetime.datetime
     ):
         """
-        Retrieves historical bar data for the given timeframe and date range,
-        then saves the data to a CSV file if it doesn't already exist.
+        Retrieves historical bar data for the given timeframe and date range.
+        If a bar store is configured, only the ranges missing from it are requested from Alpaca,
+        the new bars are saved to the store, and the merged series is returned.
+
+        Args:
+            timeframe (TimeFrame): The time frame for the bar data (e.g., 1 minute, 1 hour).
+            start (datetime): The start datetime for the data query.
+            end (datetime): The end datetime for the data query.
+
+        Returns:
+            BarSet: The bars keyed by symbol.
+        """
+        if self._store is None:
+            return self._request_bars(timeframe, start, end)
+
+        columns = self.retrieve_historical_bar_columns(timeframe, start, end)
+        return columns_to_barset(self._symbol, columns)
+
+    def retrieve_historical_bar_columns(
+        self, timeframe: TimeFrame, start: datetime.datetime, end: datetime.datetime
+    ):
+        """
+        Same as `retrieve_historical_bar_data`, but returns the bars as typed columns
+        (memory-mapped from the store when one is configured).
 
         Args:
             timeframe (TimeFrame): The time frame for the bar data (e.g., 1 minute, 1 hour).
@@ -55,8 +107,49 @@ class HistoricalDataFetcher:
             end (datetime): The end datetime for the data query.
 
         Returns:
-            None
+            dict: A mapping of column name to array (see `BAR_COLUMNS`).
+        """
+        if self._store is None:
+            bars = self._request_bars(timeframe, start, end)
+            return bars_to_columns(bars.data.get(self._symbol, []))
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if to_utc_ns(end) > to_utc_ns(now):
+            end = now
+        # the bars from the one still forming on may change, so they are fetched but not marked as fetched
+        final = to_utc_ns(forming_bar_start(timeframe, now - self._data_delay))
+
+        missing = self._store.missing_ranges(self._symbol, timeframe, start, end)
+        if missing:
+            fetched = [
+                bars_to_columns(self._request_bars(timeframe, s, e).data.get(self._symbol, []))
+                for s, e in missing
+            ]
+            columns = {name: np.concatenate([f[name] for f in fetched]) for name in BAR_COLUMNS}
+            covered = [(s, min(e, from_utc_ns(final))) for s, e in missing if to_utc_ns(s) < final]
+            self._store.write(self._symbol, timeframe, columns, covered)
+
+        return self._store.read(self._symbol, timeframe, start, end)
+
+    def retrieve_bar_series(
+        self, timeframe: TimeFrame, start: datetime.datetime, end: datetime.datetime
+    ) -> BarSeries:
         """
+        Same as `retrieve_historical_bar_data`, but returns a NumPy-backed `BarSeries`.
+
+        Args:
+            timeframe (TimeFrame): The time frame for the bar data (e.g., 1 minute, 1 hour).
+            start (datetime): The start datetime for the data query.
+            end (datetime): The end datetime for the data query.
+
+        Returns:
+            BarSeries: The bars of this fetcher's symbol.
+        """
+        return BarSeries(self._symbol, self.retrieve_historical_bar_columns(timeframe, start, end))
+
+    def _request_bars(
+        self, timeframe: TimeFrame, start: datetime.datetime, end: datetime.datetime
+    ) -> BarSet:
         # Request data from Alpaca
         request_params = StockBarsRequest(
             symbol_or_symbols=self._symbol,
@@ -64,7 +157,58 @@ class HistoricalDataFetcher:
             start=start,
             end=end,
         )
-        bars = self._client.get_stock_bars(request_params)
-        # Save the DataFrame to a CSV file
-        return bars
+        return self._client.get_stock_bars(request_params)
+
+
+def forming_bar_start(timeframe: TimeFrame, moment: datetime.datetime) -> datetime.datetime:
+    """
+    Returns the start of the bar of `timeframe` that `moment` falls in, i.e. of the bar still forming at that moment.
 
+    Minute and hour bars are aligned in UTC, daily and longer bars on midnight in `MARKET_TIMEZONE`,
+    weeks starting on Monday. For bars of several days, weeks or months, it returns an earlier
+    moment that is at or before the start of that bar.
+
+    Args:
+        timeframe (TimeFrame): The time frame of the bars.
+        moment (datetime): An aware datetime.
+
+    Returns:
+        datetime: An aware UTC datetime, not after `moment`.
+    """
+    unit, amount = timeframe.unit_value, timeframe.amount_value
+    if unit in (TimeFrameUnit.Minute, TimeFrameUnit.Hour):
+        width = 60 * 1_000_000_000 * (60 if unit == TimeFrameUnit.Hour else 1) * amount
+        ns = to_utc_ns(moment)
+        return from_utc_ns(ns - ns % width)
+
+    # bars of several days, weeks or months are not aligned on a fixed calendar, so go back far enough for any of them
+    day = moment.astimezone(MARKET_TIMEZONE).date()
+    if unit == TimeFrameUnit.Day:
+        day -= datetime.timedelta(days=amount - 1)
+    elif unit == TimeFrameUnit.Week:
+        day -= datetime.timedelta(days=day.weekday() + 7 * (amount - 1))
+    else:
+        month = day.year * 12 + day.month - 1 - (amount - 1)
+        day = datetime.date(month // 12, month % 12 + 1, 1)
+    midnight = datetime.datetime(day.year, day.month, day.day, tzinfo=MARKET_TIMEZONE)
+    return midnight.astimezone(datetime.timezone.utc)
+
+
+def columns_to_barset(symbol: str, columns) -> BarSet:
+    """
+    Rebuilds an Alpaca `BarSet` from typed columns.
+
+    Args:
+        symbol (str): Ticker symbol the bars belong to.
+        columns (dict): A mapping of column name to array (see `BAR_COLUMNS`).
+
+    Returns:
+        BarSet: The bars keyed by symbol.
+    """
+    raw_bars = [
+        {"t": from_utc_ns(t), "o": o, "h": h, "l": l, "c": c, "v": v, "n": n, "vw": None if vw != vw else vw}
+        for t, o, h, l, c, v, n, vw in zip(
+            *(columns[name].tolist() for name in BAR_COLUMNS)
+        )
+    ]
+    return BarSet({symbol: raw_bars})
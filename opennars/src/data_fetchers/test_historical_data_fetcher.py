@@ -0,0 +1,70 @@
+import datetime
+
+from alpaca.data.models import BarSet
+from alpaca.data.timeframe import TimeFrame
+
+from src.data_fetchers.bar_store import BarStore, to_utc_ns
+from src.data_fetchers.historical_data_fetcher import HistoricalDataFetcher, forming_bar_start
+
+UTC = datetime.timezone.utc
+
+
+class StubClient:
+    """A `StockHistoricalDataClient` with one bar per minute, which records the ranges it is asked for."""
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self.requests = []
+
+    def get_stock_bars(self, request) -> BarSet:
+        start, end = request.start.replace(tzinfo=UTC), request.end.replace(tzinfo=UTC)
+        self.requests.append((start, end))
+        bars = []
+        t = start
+        while t < end:
+            price = float(to_utc_ns(t) // 60_000_000_000 % 100)
+            bars.append({"t": t, "o": price, "h": price, "l": price, "c": price, "v": 1.0, "n": 1, "vw": price})
+            t += datetime.timedelta(minutes=1)
+        return BarSet({self.symbol: bars})
+
+
+def make_fetcher(tmp_path, client: StubClient) -> HistoricalDataFetcher:
+    store = BarStore(str(tmp_path))
+    return HistoricalDataFetcher("key", "secret", client.symbol, store=store, client=client, validate_symbol=False)
+
+
+def test_only_the_gaps_are_fetched_and_coverage_is_merged(tmp_path):
+    client = StubClient("SPY")
+    fetcher = make_fetcher(tmp_path, client)
+    t0 = datetime.datetime(2024, 1, 2, 15, 0, tzinfo=UTC)
+    minutes = lambda n: t0 + datetime.timedelta(minutes=n)
+
+    columns = fetcher.retrieve_historical_bar_columns(TimeFrame.Minute, minutes(0), minutes(10))
+    assert client.requests == [(minutes(0), minutes(10))]
+    assert len(columns["timestamp"]) == 10
+
+    fetcher.retrieve_historical_bar_columns(TimeFrame.Minute, minutes(20), minutes(30))
+    columns = fetcher.retrieve_historical_bar_columns(TimeFrame.Minute, minutes(5), minutes(25))
+    # only the gap between the two earlier ranges is requested
+    assert client.requests[-1] == (minutes(10), minutes(20))
+    assert len(columns["timestamp"]) == 21
+    assert fetcher._store.coverage("SPY", TimeFrame.Minute) == [(to_utc_ns(minutes(0)), to_utc_ns(minutes(30)))]
+
+    n_requests = len(client.requests)
+    fetcher.retrieve_historical_bar_columns(TimeFrame.Minute, minutes(0), minutes(30))
+    assert len(client.requests) == n_requests
+
+
+def test_the_forming_bar_is_not_marked_as_fetched(tmp_path):
+    client = StubClient("SPY")
+    fetcher = make_fetcher(tmp_path, client)
+    now = datetime.datetime.now(UTC)
+    start = now - datetime.timedelta(hours=1)
+
+    fetcher.retrieve_historical_bar_columns(TimeFrame.Minute, start, now + datetime.timedelta(days=1))
+    (_, covered_end), = fetcher._store.coverage("SPY", TimeFrame.Minute)
+    assert covered_end <= to_utc_ns(forming_bar_start(TimeFrame.Minute, datetime.datetime.now(UTC) - fetcher._data_delay))
+
+    # the recent bars are requested again
+    fetcher.retrieve_historical_bar_columns(TimeFrame.Minute, start, now)
+    assert to_utc_ns(client.requests[-1][0]) == covered_end
@@ -0,0 +1,93 @@
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+# a line of `python -X importtime`: "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def import_times(module: str) -> list:
+    """
+    Imports a module in a fresh interpreter with `-X importtime`.
+
+    Args:
+        module (str): The module to import, e.g. "pynars.NARS".
+
+    Returns:
+        list: (cumulative seconds, self seconds, depth, module name) of every module imported along with it,
+            in the order they finished importing.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            times.append((int(cumulative_us) / 1e6, int(self_us) / 1e6, (len(indent) - 1) // 2, name))
+    return times
+
+
+def construction_times(config: str) -> list:
+    """
+    Times the steps of building a `Reasoner` in this process, in the order they first happen in a worker.
+
+    Args:
+        config (str): Path to the pynars config file.
+
+    Returns:
+        list: (step, seconds) pairs.
+    """
+    times = []
+
+    t = time.perf_counter()
+    from pynars.NARS import Reasoner
+    from pynars.NARS.InferenceEngine import KanrenEngine, VariableEngine, TemporalEngine
+    times.append(("import pynars.NARS", time.perf_counter() - t))
+
+    for step, build in (
+        ("Reasoner(100, 100)", lambda: Reasoner(100, 100, config=config)),
+        ("KanrenEngine()", KanrenEngine),
+        ("VariableEngine()", VariableEngine),
+        ("TemporalEngine()", TemporalEngine),
+        ("Reasoner(100, 100), again", lambda: Reasoner(100, 100, config=config)),
+    ):
+        t = time.perf_counter()
+        build()
+        times.append((step, time.perf_counter() - t))
+    return times
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Report where the cold start of a predictor worker goes.")
+
+    parser.add_argument("--module", type=str, default="pynars.NARS", help="Module to profile the import of (default: pynars.NARS)")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest imports to list (default: 20)")
+    parser.add_argument("--config", type=str, default="./config.json", help="Path to the pynars config file")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    times = import_times(args.module)
+    total = max(cumulative for cumulative, _, _, _ in times) if times else 0.0
+    print(f"import {args.module}: {total:.3f}s, {len(times)} modules")
+    print(f"{'cumulative':>11} {'self':>8}  module")
+    for cumulative, self_time, depth, name in sorted(times, reverse=True)[: args.top]:
+        print(f"{cumulative:10.3f}s {self_time:7.3f}s  {'  ' * depth}{name}")
+
+    print()
+    for step, seconds in construction_times(args.config):
+        print(f"{seconds:10.3f}s  {step}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import datetime
+import itertools
+import tempfile
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+
+import jstyleson
+
+from alpaca.data.timeframe import TimeFrame
+from config.config import Config
+from src.data_fetchers.bar_store import BarStore
+from backtest import CHANNEL_SIZES, OPERATIONS, load_series
+
+# the sweepable parameters of a run, besides the symbol and the config knobs
+RUN_PARAMETERS = ("augment", "buffer", "cycles_per_bar", "seed") + tuple(CHANNEL_SIZES)
+
+RESULT_COLUMNS = (
+    ("run", "symbol") + RUN_PARAMETERS + ("config",)
+    + ("n_bars", "mean_score") + tuple(f"n_{name.lstrip('^')}" for name in OPERATIONS)
+    + ("seconds", "error")
+)
+
+
+def make_grid(symbols, parameters: dict, knobs: dict) -> list:
+    """
+    Expands the values to sweep into one dict per run.
+
+    Args:
+        symbols (list): Ticker symbols.
+        parameters (dict): A list of values for each of `RUN_PARAMETERS`.
+        knobs (dict): A list of values for each config knob, keyed by its path in `config.json`
+            below "HYPER-PARAMS.DEFAULT", e.g. "BUDGET.PRIORITY_JUDGEMENT".
+
+    Returns:
+        list: The cartesian product of everything, as dicts.
+    """
+    names = list(parameters) + list(knobs)
+    values = list(parameters.values()) + list(knobs.values())
+    grid = []
+    for symbol in symbols:
+        for combination in itertools.product(*values):
+            run = dict(zip(names, combination))
+            grid.append(
+                {
+                    "symbol": symbol,
+                    "parameters": {name: run[name] for name in parameters},
+                    "knobs": {name: run[name] for name in knobs},
+                }
+            )
+    return grid
+
+
+def write_config(base: str, knobs: dict, directory: str) -> str:
+    """
+    Writes a copy of the pynars config file `base` with some of its default hyper-parameters replaced.
+
+    Returns:
+        str: The path of the new file.
+    """
+    with open(base, "r") as f:
+        content = jstyleson.load(f)
+    for path, value in knobs.items():
+        node = content["HYPER-PARAMS"]["DEFAULT"]
+        *parents, name = path.split(".")
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[name] = value
+    fd, path = tempfile.mkstemp(suffix=".json", dir=directory)
+    with os.fdopen(fd, "w") as f:
+        json.dump(content, f)
+    return path
+
+
+def run_one(index: int, spec: dict, data: dict, base_config: str, limit: int, workdir: str) -> dict:
+    """
+    Runs a single backtest. This is executed in a worker process.
+
+    The bars are opened memory-mapped from the bar store, so all the workers share one copy of them
+    through the page cache instead of each receiving a pickled array.
+    """
+    from backtest import backtest
+
+    row = {"run": index, "symbol": spec["symbol"], **spec["parameters"], "config": json.dumps(spec["knobs"])}
+    t = time.perf_counter()
+    try:
+        timeframe, start, end = data["timeframe"], data["start"], data["end"]
+        close = BarStore(data["root"]).read(spec["symbol"], timeframe, start, end)["close"][:limit]
+
+        parameters = dict(spec["parameters"])
+        channel_sizes = {name: parameters.pop(name) for name in CHANNEL_SIZES if name in parameters}
+        config = write_config(base_config, spec["knobs"], workdir) if spec["knobs"] else base_config
+
+        result = backtest(close, config=config, channel_sizes=channel_sizes, **parameters)
+
+        row["n_bars"] = len(close)
+        row["mean_score"] = result.mean_score
+        for name, n in zip(OPERATIONS, result.operations.sum(axis=0).tolist()):
+            row[f"n_{name.lstrip('^')}"] = n
+    except Exception:
+        row["error"] = traceback.format_exc(limit=3).strip().splitlines()[-1]
+    row["seconds"] = round(time.perf_counter() - t, 3)
+    return row
+
+
+def sweep(
+    grid: list,
+    timeframe,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    output: str,
+    workers: int = None,
+    base_config: str = "./config.json",
+    limit: int = None,
+) -> None:
+    """
+    Runs every backtest of `grid` in its own worker process and writes one row per run to `output` (CSV).
+
+    Every symbol is fetched into the bar store up front, in this process; the workers only read from it.
+    Rows are appended as soon as their run finishes, so an interrupted sweep keeps its results.
+
+    Args:
+        grid (list): Runs as built by `make_grid`.
+        timeframe (TimeFrame): The time frame of the bars.
+        start (datetime): Start of the bars.
+        end (datetime): End of the bars.
+        output (str): Path of the CSV results table.
+        workers (int): Number of worker processes. Defaults to the number of cores.
+        base_config (str): The pynars config file that the config knobs are applied to.
+        limit (int): Only use the first N bars of every symbol.
+    """
+    end = min(end, datetime.datetime.now())
+    for symbol in sorted({spec["symbol"] for spec in grid}):
+        load_series(symbol, timeframe, start, end)
+    data = {"root": Config.BAR_STORE_DIR, "timeframe": timeframe, "start": start, "end": end}
+
+    # "spawn" gives every worker a fresh interpreter: pynars loads its config into class attributes
+    kwargs = {"mp_context": multiprocessing.get_context("spawn")}
+    if sys.version_info >= (3, 11):
+        # and a fresh one for every run, since the runs differ in their config knobs
+        kwargs["max_tasks_per_child"] = 1
+
+    with tempfile.TemporaryDirectory() as workdir, open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        with ProcessPoolExecutor(max_workers=workers, **kwargs) as executor:
+            futures = [
+                executor.submit(run_one, i, spec, data, base_config, limit, workdir) for i, spec in enumerate(grid)
+            ]
+            for future in as_completed(futures):
+                row = future.result()
+                writer.writerow(row)
+                f.flush()
+                status = row.get("error") or f"mean score {row['mean_score']:.4f}"
+                print(f"[{row['run'] + 1}/{len(grid)}] {row['symbol']}: {status} ({row['seconds']}s)")
+
+
+def parse_knob(text: str):
+    """Parses "PATH=v1,v2,..." into (PATH, [v1, v2, ...])."""
+    path, _, values = text.partition("=")
+    if not path or not values:
+        raise argparse.ArgumentTypeError(f"Expected PATH=VALUE[,VALUE...], got: {text}")
+    return path, [json.loads(value) for value in values.split(",")]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sweep backtests of the NARS predictor over a process pool.")
+
+    parser.add_argument("--symbols", type=str, nargs="+", default=["SPY"], help="Ticker symbols (default: SPY)")
+    parser.add_argument("--start", type=str, default="2020-01-01", help="Start date in YYYY-MM-DD format")
+    parser.add_argument("--end", type=str, default="2025-01-01", help="End date in YYYY-MM-DD format")
+    parser.add_argument("--timeframe", type=str, default="day", choices=["minute", "hour", "day"],
+                        help="Timeframe for the data (default: day)")
+    parser.add_argument("--augment", type=float, nargs="+", default=[100], help="Values of augment")
+    parser.add_argument("--buffer", type=float, nargs="+", default=[1], help="Values of the buffer tolerance")
+    parser.add_argument("--cycles-per-bar", type=int, nargs="+", default=[1], help="Values of cycles per bar")
+    parser.add_argument("--seed", type=int, nargs="+", default=[0], help="Random seeds")
+    for name, default in CHANNEL_SIZES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, nargs="+", default=[default],
+                            help=f"Values of the channel's {name} (default: {default})")
+    parser.add_argument("--knob", type=parse_knob, action="append", default=[], metavar="PATH=V1,V2",
+                        help="A config.json hyper-parameter below HYPER-PARAMS.DEFAULT and its values, "
+                             "e.g. BUDGET.PRIORITY_JUDGEMENT=0.7,0.9 (repeatable)")
+    parser.add_argument("--config", type=str, default="./config.json", help="Base pynars config file")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N bars")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", type=str, default="sweep.csv", help="Results table (default: sweep.csv)")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    timeframe_map = {
+        "minute": TimeFrame.Minute,
+        "hour": TimeFrame.Hour,
+        "day": TimeFrame.Day,
+    }
+    start = datetime.datetime.strptime(args.start, "%Y-%m-%d")
+    end = datetime.datetime.strptime(args.end, "%Y-%m-%d")
+
+    parameters = {name: getattr(args, name) for name in RUN_PARAMETERS}
+    grid = make_grid(args.symbols, parameters, dict(args.knob))
+    print(f"{len(grid)} runs")
+
+    sweep(grid, timeframe_map[args.timeframe], start, end, args.output, args.workers, args.config, args.limit)
+
+
+if __name__ == "__main__":
+    # pinned for the workers as well, see backtest.py
+    if os.environ.get("PYTHONHASHSEED") != "0":
+        os.environ["PYTHONHASHSEED"] = "0"
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    main()
@@ -0,0 +1,305 @@
+import socket
+import struct
+import time
+from collections import deque
+from typing import List, Optional
+
+nars_address = ("127.0.0.1", 54321)
+predict_address = ("127.0.0.1", 12345)
+
+# the largest payload of a UDP datagram over IPv4
+MAX_DATAGRAM = 65507
+
+_length = struct.Struct("!I")
+
+
+def pack(messages: List[str], max_size: int = MAX_DATAGRAM) -> List[bytes]:
+    """
+    Frame messages as `[4-byte big-endian length][utf-8 text]` records and pack as many records into each
+    datagram as fit into `max_size` bytes.
+    """
+    datagrams = []
+    current = bytearray()
+    for message in messages:
+        data = message.encode()
+        record_size = _length.size + len(data)
+        if record_size > max_size:
+            raise ValueError(f"A message of {len(data)} bytes does not fit into a datagram.")
+        if len(current) + record_size > max_size:
+            datagrams.append(bytes(current))
+            current = bytearray()
+        current += _length.pack(len(data))
+        current += data
+    if current:
+        datagrams.append(bytes(current))
+    return datagrams
+
+
+def unpack(datagram: bytes) -> List[str]:
+    """Split a datagram built by `pack` back into its messages."""
+    messages = []
+    offset = 0
+    while offset < len(datagram):
+        (size,) = _length.unpack_from(datagram, offset)
+        offset += _length.size
+        if offset + size > len(datagram):
+            raise ValueError("Truncated datagram.")
+        messages.append(datagram[offset : offset + size].decode())
+        offset += size
+    return messages
+
+
+class RingBuffer:
+    """
+    A bounded FIFO for exactly one producer thread and one consumer thread.
+
+    It does not take any lock: the producer only ever moves `_tail` and the consumer only ever moves `_head`,
+    and an item is written into its slot before `_tail` is published. Both index updates are single
+    attribute assignments, which are atomic in CPython.
+
+    When the buffer is full, `put` waits (up to `timeout`) instead of dropping the item, so a slow consumer
+    throttles the producer rather than losing messages.
+    """
+
+    def __init__(self, capacity: int, poll_interval: float = 0.0001):
+        if capacity <= 0:
+            raise ValueError("The capacity of a ring buffer must be positive.")
+        # one slot is always left empty to tell "full" from "empty"
+        self._slots = [None] * (capacity + 1)
+        self._head = 0
+        self._tail = 0
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+
+    def __len__(self):
+        return (self._tail - self._head) % len(self._slots)
+
+    @property
+    def empty(self):
+        return self._head == self._tail
+
+    @property
+    def full(self):
+        return (self._tail + 1) % len(self._slots) == self._head
+
+    def try_put(self, item) -> bool:
+        """
+        Producer side. Append an item if there is room, return whether it was appended.
+        """
+        tail = self._tail
+        next_tail = (tail + 1) % len(self._slots)
+        if next_tail == self._head:
+            return False
+        self._slots[tail] = item
+        self._tail = next_tail
+        return True
+
+    def put(self, item, timeout: Optional[float] = None) -> bool:
+        """
+        Producer side. Append an item, waiting for room if the buffer is full.
+        Return False if the item could not be appended within `timeout` seconds (None means wait forever).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_put(item):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def try_get(self):
+        """
+        Consumer side. Remove and return the oldest item, or None if the buffer is empty.
+        """
+        head = self._head
+        if head == self._tail:
+            return None
+        item = self._slots[head]
+        self._slots[head] = None
+        self._head = (head + 1) % len(self._slots)
+        return item
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Consumer side. Remove and return the oldest item, waiting for one if the buffer is empty.
+        Return None if nothing arrived within `timeout` seconds (None means wait forever).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.empty:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+        return self.try_get()
+
+    def drain(self) -> list:
+        """
+        Consumer side. Remove and return everything currently in the buffer, oldest first.
+        """
+        items = []
+        while not self.empty:
+            items.append(self.try_get())
+        return items
+
+
+class Transport:
+    """
+    Carries status messages from the market feed to a `PredictorChannel`, and operation commands
+    (e.g. "^up") back from the channel to the feed.
+
+    Status messages are Narsese sentences, either as text or as already built `Task`s.
+    """
+
+    def send_status(self, messages: list) -> None:
+        """Feed side. Deliver the status messages of one bar."""
+        raise NotImplementedError
+
+    def receive_status(self, timeout: Optional[float] = None) -> Optional[list]:
+        """
+        Channel side. Wait for the next bar's status messages.
+        Return None if nothing arrived within `timeout` seconds (None means wait forever).
+        """
+        raise NotImplementedError
+
+    def send_command(self, command: str) -> None:
+        """Channel side. Deliver an operation command."""
+        raise NotImplementedError
+
+    def receive_command(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Feed side. Wait for the next operation command.
+        Return None if nothing arrived within `timeout` seconds (None means wait forever).
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessTransport(Transport):
+    """
+    Connects a feed loop and a reasoner thread living in the same process through two ring buffers.
+    Nothing is serialized, and a message costs one queue hop instead of a system call.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.status = RingBuffer(capacity)
+        self.commands = RingBuffer(capacity)
+
+    def send_status(self, messages: list) -> None:
+        self.status.put(list(messages))
+
+    def receive_status(self, timeout: Optional[float] = None) -> Optional[list]:
+        messages = self.status.get(timeout)
+        if messages is None:
+            return None
+        # if the reasoner fell behind, catch up with everything that is already waiting
+        for each in self.status.drain():
+            messages.extend(each)
+        return messages
+
+    def send_command(self, command: str) -> None:
+        self.commands.put(command)
+
+    def receive_command(self, timeout: Optional[float] = None) -> Optional[str]:
+        return self.commands.get(timeout)
+
+
+class UdpTransport(Transport):
+    """
+    The network transport, for running the feed and `PredictorChannel.py` as separate processes.
+
+    The feed process and the channel process each create their own instance and use one side of it.
+    Every socket is created once, on first use, and kept open until `close`.
+
+    A datagram carries a batch of messages, each prefixed with its length (see `pack` and `unpack`),
+    so any number of sentences fit into a bar and none of them is ever truncated. Receiving waits for the
+    first datagram only, then drains whatever else is already queued on the socket without blocking.
+    """
+
+    def __init__(
+        self,
+        nars_address=nars_address,
+        predict_address=predict_address,
+        receive_buffer_size: int = 1 << 20,
+    ):
+        self.nars_address = nars_address
+        self.predict_address = predict_address
+        self.receive_buffer_size = receive_buffer_size
+        self._send_sock = None
+        self._status_sock = None
+        self._command_sock = None
+        self._commands = deque()
+
+    def _sender(self) -> socket.socket:
+        if self._send_sock is None:
+            self._send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        return self._send_sock
+
+    def _receiver(self, address) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer_size)
+        sock.bind(address)
+        return sock
+
+    def _send(self, messages: list, address) -> None:
+        sock = self._sender()
+        for datagram in pack([str(each) for each in messages]):
+            sock.sendto(datagram, address)
+
+    def _receive(self, sock: socket.socket, timeout: Optional[float]) -> Optional[list]:
+        sock.setblocking(True)
+        sock.settimeout(timeout)
+        try:
+            data = sock.recv(MAX_DATAGRAM)
+        except (socket.timeout, BlockingIOError):
+            # a timeout of 0 makes the socket non-blocking, which raises BlockingIOError instead
+            return None
+        messages = unpack(data)
+
+        # everything else that is already queued belongs to this cycle as well
+        sock.setblocking(False)
+        while True:
+            try:
+                data = sock.recv(MAX_DATAGRAM)
+            except BlockingIOError:
+                break
+            messages.extend(unpack(data))
+        return messages
+
+    def send_status(self, messages: list) -> None:
+        self._send(messages, self.nars_address)
+
+    def receive_status(self, timeout: Optional[float] = None) -> Optional[list]:
+        if self._status_sock is None:
+            self._status_sock = self._receiver(self.nars_address)
+        messages = self._receive(self._status_sock, timeout)
+        if messages is None:
+            return None
+        return [each for each in messages if each != "CONNECTION FAILED"]
+
+    def send_command(self, command: str) -> None:
+        self._send([command], self.predict_address)
+
+    def receive_command(self, timeout: Optional[float] = None) -> Optional[str]:
+        if self._command_sock is None:
+            self._command_sock = self._receiver(self.predict_address)
+        # commands are handed out one at a time, but read from the socket in batches
+        if not self._commands:
+            commands = self._receive(self._command_sock, timeout)
+            if not commands:
+                return None
+            self._commands.extend(commands)
+        return self._commands.popleft()
+
+    def close(self) -> None:
+        for sock in (self._send_sock, self._status_sock, self._command_sock):
+            if sock is not None:
+                sock.close()
+        self._send_sock = self._status_sock = self._command_sock = None
+
+
+def make_transport(name: str, **kwargs) -> Transport:
+    """Build a transport by name: "inprocess" or "udp"."""
+    transports = {"inprocess": InProcessTransport, "udp": UdpTransport}
+    if name not in transports:
+        raise ValueError(f"Unknown transport: {name}. Choose from {list(transports)}.")
+    return transports[name](**kwargs)